@@ -0,0 +1,113 @@
+"""Compare the cached timestamp and duration parsing with the previous code.
+
+Run from the repository root:
+
+    python benchmarks/bench_time_parsing.py
+"""
+
+import datetime
+from pathlib import Path
+import random
+import sys
+import timeit
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "custom_components" / "trias"))
+
+from trias_client import timeparse  # noqa: E402
+from trias_client.utils import parse_duration, to_datetime  # noqa: E402
+
+NUMBER = 20
+
+
+def legacy_to_datetime(zulu_time):
+    """to_datetime before the cache."""
+    if not zulu_time:
+        return None
+
+    return datetime.datetime.fromisoformat(zulu_time)
+
+
+def legacy_parse_duration(duration):
+    """parse_duration before the ISO 8601 parser."""
+    minutes = 0
+    hours = 0
+
+    try:
+        hours = int(duration[2 : duration.index("H")])
+    except ValueError:
+        pass
+
+    try:
+        if "H" in duration:
+            minutes = int(duration[duration.index("H") + 1 : duration.index("M")])
+        else:
+            minutes = int(duration[2 : duration.index("M")])
+    except ValueError:
+        pass
+
+    parsed_duration = datetime.timedelta(hours=hours, minutes=minutes)
+    return str(parsed_duration)
+
+
+def timestamps(count: int = 5000) -> list[str]:
+    """Return timestamps like a few refreshes of busy stops produce.
+
+    Departures are on the minute within the next two hours, and each one
+    shows up as timetabled and estimated time on every refresh.
+    """
+    start = datetime.datetime(2024, 5, 6, 7, 0, tzinfo=datetime.timezone.utc)
+    rng = random.Random(1)
+    values = []
+    for _ in range(count):
+        departure = start + datetime.timedelta(minutes=rng.randrange(120))
+        values.append(departure.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return values
+
+
+def durations(count: int = 5000) -> list[str]:
+    """Return trip durations between a few minutes and two hours."""
+    rng = random.Random(2)
+    values = []
+    for _ in range(count):
+        minutes = rng.randrange(5, 120)
+        hours, minutes = divmod(minutes, 60)
+        values.append(f"PT{hours}H{minutes}M" if hours else f"PT{minutes}M")
+    return values
+
+
+def bench(name: str, function, values: list[str]) -> float:
+    """Print and return the time per call in microseconds."""
+    seconds = timeit.timeit(
+        lambda: [function(value) for value in values], number=NUMBER
+    )
+    per_call = seconds / (NUMBER * len(values)) * 1e6
+    print(f"  {name:<22} {per_call:8.3f} us/call")
+    return per_call
+
+
+def main() -> None:
+    values = timestamps()
+    print(f"Timestamps ({len(set(values))} distinct of {len(values)})")
+    legacy = bench("fromisoformat", legacy_to_datetime, values)
+    cached = bench("to_datetime (cached)", to_datetime, values)
+    print(f"  speedup {legacy / cached:.1f}x")
+
+    values = durations()
+    print(f"Durations ({len(set(values))} distinct of {len(values)})")
+    legacy = bench("legacy parse_duration", legacy_parse_duration, values)
+    cached = bench("parse_duration", parse_duration, values)
+    bench("parse_iso_duration", timeparse.parse_iso_duration, values)
+    print(f"  speedup {legacy / cached:.1f}x")
+
+    mismatches = [
+        value
+        for value in values
+        if legacy_parse_duration(value) != parse_duration(value)
+    ]
+    print(f"  results differing from the legacy parser: {len(mismatches)}")
+
+    print(timeparse.cache_info())
+
+
+if __name__ == "__main__":
+    main()
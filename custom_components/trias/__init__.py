@@ -6,17 +6,40 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 from requests.exceptions import RequestException
 
 from .const import DEFAULT_SCAN_INTERVAL, DOMAIN
 from .coordinator import TriasDataUpdateCoordinator
+from .station_cache import async_get_station_cache
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_CLEAR_STATION_CACHE = "clear_station_cache"
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Trias API services."""
+
+    async def _async_clear_station_cache(call: ServiceCall) -> None:
+        """Drop all cached station data."""
+        cache = await async_get_station_cache(hass)
+        removed = await cache.async_invalidate()
+        _LOGGER.info("Cleared %s cached stations", removed)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_CLEAR_STATION_CACHE, _async_clear_station_cache
+    )
+
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Trias API from a config entry."""
@@ -31,7 +54,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         update_interval=DEFAULT_SCAN_INTERVAL,
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # Setup is retried with a new coordinator, release the session and
+        # the parse executor of this one
+        hass.data[DOMAIN].pop(entry.entry_id)
+        if coordinator.client is not None:
+            await coordinator.client.close()
+        raise
 
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
@@ -13,8 +13,38 @@ from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
 from requests.exceptions import MissingSchema
 
-from .const import DEFAULT_DEPARTURE_LIMIT, DOMAIN
+from .coordinator import async_resolve_time_zone
+from .const import (
+    DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_CIRCUIT_RECOVERY_TIMEOUT,
+    DEFAULT_COUNTDOWN_INTERVAL,
+    DEFAULT_DAILY_QUOTA,
+    DEFAULT_DELAY_THRESHOLD,
+    DEFAULT_DEPARTURE_LIMIT,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_HORIZON,
+    DEFAULT_HORIZON_RESULTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_OFFLOAD_THRESHOLD_KIB,
+    DEFAULT_PARSE_WORKERS,
+    DEFAULT_PARSER_BACKEND,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_REALTIME_WINDOW,
+    DEFAULT_REQUEST_PROFILE,
+    DEFAULT_REFRESH_JITTER,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_STATION_CACHE_TTL,
+    DEFAULT_STATION_LOOKUP_TIMEOUT,
+    DOMAIN,
+)
 from .trias_client import client as trias
+from .trias_client.parser import BACKEND_AUTO, available_backends
+from .trias_client.profiles import PROFILES
 from .trias_client.exceptions import HttpError, InvalidApiKey, InvalidRequest
 
 _LOGGER = logging.getLogger(__name__)
@@ -83,7 +113,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
-OPTIONS_MENU = {"stops": "Stops", "trips": "Trips"}
+OPTIONS_MENU = {"stops": "Stops", "trips": "Trips", "advanced": "Advanced"}
 
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
@@ -132,6 +162,14 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             description={"suggested_value": stop_id_dict},
                         ): selector.ObjectSelector(),
                         vol.Optional("add_stop", default=False): bool,
+                        vol.Optional(
+                            "stop_filters",
+                            description={
+                                "suggested_value": self.config_entry.options.get(
+                                    "stop_filters", {}
+                                )
+                            },
+                        ): selector.ObjectSelector(),
                         vol.Optional(
                             "departure_limit_config",
                             default=self.config_entry.options.get(
@@ -182,6 +220,198 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
         return await self.save(user_input)
 
+    async def async_step_advanced(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the advanced options."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            time_zone = user_input.get("time_zone")
+            if (
+                time_zone
+                and await async_resolve_time_zone(self.hass, time_zone) is None
+            ):
+                errors["time_zone"] = "invalid_time_zone"
+
+        if user_input is None or errors:
+            options = self.config_entry.options
+            parser_backends = [BACKEND_AUTO, *available_backends()]
+            parser_backend = options.get("parser_backend", DEFAULT_PARSER_BACKEND)
+            if parser_backend not in parser_backends:
+                # E.g. lxml was uninstalled
+                parser_backend = BACKEND_AUTO
+
+            return self.async_show_form(
+                step_id="advanced",
+                data_schema=vol.Schema(
+                    {
+                        vol.Optional(
+                            "min_scan_interval",
+                            default=options.get(
+                                "min_scan_interval", DEFAULT_SCAN_INTERVAL * 60
+                            ),
+                        ): vol.All(int, vol.Range(min=10)),
+                        vol.Optional(
+                            "max_scan_interval",
+                            default=options.get(
+                                "max_scan_interval", DEFAULT_MAX_SCAN_INTERVAL
+                            ),
+                        ): vol.All(int, vol.Range(min=10)),
+                        vol.Optional(
+                            "refresh_jitter",
+                            default=options.get(
+                                "refresh_jitter", DEFAULT_REFRESH_JITTER
+                            ),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "delay_threshold",
+                            default=options.get(
+                                "delay_threshold", DEFAULT_DELAY_THRESHOLD
+                            ),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "countdown_interval",
+                            default=options.get(
+                                "countdown_interval", DEFAULT_COUNTDOWN_INTERVAL
+                            ),
+                        ): vol.All(int, vol.Range(min=1)),
+                        vol.Optional(
+                            "refresh_intervals",
+                            description={
+                                "suggested_value": options.get("refresh_intervals", {})
+                            },
+                        ): selector.ObjectSelector(),
+                        vol.Optional(
+                            "daily_quota",
+                            default=options.get("daily_quota", DEFAULT_DAILY_QUOTA),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "refresh_priorities",
+                            description={
+                                "suggested_value": options.get("refresh_priorities", {})
+                            },
+                        ): selector.ObjectSelector(),
+                        vol.Optional(
+                            "horizon",
+                            default=options.get("horizon", DEFAULT_HORIZON),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "horizon_results",
+                            default=options.get(
+                                "horizon_results", DEFAULT_HORIZON_RESULTS
+                            ),
+                        ): vol.All(int, vol.Range(min=1)),
+                        vol.Optional(
+                            "realtime_window",
+                            default=options.get(
+                                "realtime_window", DEFAULT_REALTIME_WINDOW
+                            ),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "stale_window",
+                            default=options.get("stale_window", DEFAULT_STALE_WINDOW),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "fallback_urls",
+                            default=options.get("fallback_urls", []),
+                        ): selector.TextSelector(
+                            selector.TextSelectorConfig(
+                                type=selector.TextSelectorType.URL, multiple=True
+                            )
+                        ),
+                        vol.Optional(
+                            "rate_limit",
+                            default=options.get("rate_limit", DEFAULT_RATE_LIMIT),
+                        ): vol.All(vol.Coerce(float), vol.Range(min=0.01)),
+                        vol.Optional(
+                            "rate_burst",
+                            default=options.get("rate_burst", DEFAULT_RATE_BURST),
+                        ): vol.All(int, vol.Range(min=1)),
+                        vol.Optional(
+                            "max_concurrent_requests",
+                            default=options.get(
+                                "max_concurrent_requests",
+                                DEFAULT_MAX_CONCURRENT_REQUESTS,
+                            ),
+                        ): vol.All(int, vol.Range(min=1)),
+                        vol.Optional(
+                            "max_retries",
+                            default=options.get("max_retries", DEFAULT_MAX_RETRIES),
+                        ): vol.All(int, vol.Range(min=0, max=10)),
+                        vol.Optional(
+                            "circuit_failure_threshold",
+                            default=options.get(
+                                "circuit_failure_threshold",
+                                DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+                            ),
+                        ): vol.All(int, vol.Range(min=1)),
+                        vol.Optional(
+                            "circuit_recovery_timeout",
+                            default=options.get(
+                                "circuit_recovery_timeout",
+                                DEFAULT_CIRCUIT_RECOVERY_TIMEOUT,
+                            ),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "hedge_percentile",
+                            default=options.get(
+                                "hedge_percentile", DEFAULT_HEDGE_PERCENTILE
+                            ),
+                        ): vol.All(vol.Coerce(float), vol.Range(min=0, max=99.9)),
+                        vol.Optional(
+                            "time_zone",
+                            description={"suggested_value": options.get("time_zone")},
+                        ): selector.TextSelector(),
+                        vol.Optional(
+                            "request_profile",
+                            default=options.get(
+                                "request_profile", DEFAULT_REQUEST_PROFILE
+                            ),
+                        ): selector.SelectSelector(
+                            selector.SelectSelectorConfig(options=list(PROFILES))
+                        ),
+                        vol.Optional(
+                            "parser_backend", default=parser_backend
+                        ): selector.SelectSelector(
+                            selector.SelectSelectorConfig(options=parser_backends)
+                        ),
+                        vol.Optional(
+                            "parse_workers",
+                            default=options.get("parse_workers", DEFAULT_PARSE_WORKERS),
+                        ): vol.All(int, vol.Range(min=1, max=8)),
+                        vol.Optional(
+                            "offload_threshold",
+                            default=options.get(
+                                "offload_threshold", DEFAULT_OFFLOAD_THRESHOLD_KIB
+                            ),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "station_cache_ttl",
+                            default=options.get(
+                                "station_cache_ttl", DEFAULT_STATION_CACHE_TTL
+                            ),
+                        ): vol.All(int, vol.Range(min=0)),
+                        vol.Optional(
+                            "setup_concurrency",
+                            default=options.get(
+                                "setup_concurrency", DEFAULT_SETUP_CONCURRENCY
+                            ),
+                        ): vol.All(int, vol.Range(min=1, max=16)),
+                        vol.Optional(
+                            "station_lookup_timeout",
+                            default=options.get(
+                                "station_lookup_timeout",
+                                DEFAULT_STATION_LOOKUP_TIMEOUT,
+                            ),
+                        ): vol.All(int, vol.Range(min=1)),
+                    }
+                ),
+                errors=errors,
+            )
+
+        return await self.save(user_input)
+
     async def async_step_trip_name(
         self, user_input: dict[str, str] = None, add={}
     ) -> FlowResult:
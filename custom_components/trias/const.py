@@ -1,5 +1,23 @@
 """Constants for the Trias API integration."""
 
+# Defaults of client settings are defined by the client, options use them
+from .trias_client.offload import (
+    DEFAULT_OFFLOAD_THRESHOLD as DEFAULT_OFFLOAD_THRESHOLD_BYTES,
+    DEFAULT_PARSE_WORKERS,
+)
+from .trias_client.parser import BACKEND_AUTO
+from .trias_client.profiles import DEFAULT_PROFILE
+from .trias_client.ratelimit import (
+    DEFAULT_MAX_CONCURRENT as DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+)
+from .trias_client.resilience import (
+    DEFAULT_FAILURE_THRESHOLD as DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RECOVERY_TIMEOUT as DEFAULT_CIRCUIT_RECOVERY_TIMEOUT,
+)
+
 DOMAIN = "trias"
 
 DEFAULT_SCAN_INTERVAL = 1  # Minutes
@@ -7,3 +25,34 @@ DEFAULT_SCAN_INTERVAL = 1  # Minutes
 ATTRIBUTION = "Data provided by Trias API"
 
 DEFAULT_DEPARTURE_LIMIT = 2
+
+DEFAULT_PARSER_BACKEND = BACKEND_AUTO
+
+# The offload threshold option is set in KiB
+DEFAULT_OFFLOAD_THRESHOLD_KIB = DEFAULT_OFFLOAD_THRESHOLD_BYTES // 1024
+
+DEFAULT_STATION_CACHE_TTL = 7  # Days
+
+DEFAULT_SETUP_CONCURRENCY = 4
+
+DEFAULT_STATION_LOOKUP_TIMEOUT = 15  # Seconds
+
+DEFAULT_MAX_SCAN_INTERVAL = 900  # Seconds
+
+DEFAULT_REFRESH_JITTER = 10  # Seconds
+
+DEFAULT_STALE_WINDOW = 900  # Seconds
+
+DEFAULT_COUNTDOWN_INTERVAL = 10  # Seconds
+
+DEFAULT_DELAY_THRESHOLD = 60  # Seconds
+
+DEFAULT_HORIZON = 60  # Minutes
+DEFAULT_HORIZON_RESULTS = 30
+DEFAULT_REALTIME_WINDOW = 30  # Minutes
+
+DEFAULT_DAILY_QUOTA = 0  # Requests per day, 0 is unlimited
+
+DEFAULT_HEDGE_PERCENTILE = 0  # 0 disables hedged requests
+
+DEFAULT_REQUEST_PROFILE = DEFAULT_PROFILE
@@ -4,23 +4,69 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, tzinfo
 import async_timeout
-import aiohttp
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 from .trias_client.async_client import AsyncTriasClient, AuthMethod
 from .trias_client.exceptions import ApiError, InvalidLocationName, HttpError
+from .trias_client.models import Departure, Trip
+from .trias_client.ratelimit import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
 from homeassistant.exceptions import ConfigEntryNotReady
 
-from .const import DEFAULT_DEPARTURE_LIMIT
+from .const import (
+    DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_CIRCUIT_RECOVERY_TIMEOUT,
+    DEFAULT_COUNTDOWN_INTERVAL,
+    DEFAULT_DAILY_QUOTA,
+    DEFAULT_DELAY_THRESHOLD,
+    DEFAULT_DEPARTURE_LIMIT,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_HORIZON,
+    DEFAULT_HORIZON_RESULTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_OFFLOAD_THRESHOLD_KIB,
+    DEFAULT_PARSE_WORKERS,
+    DEFAULT_PARSER_BACKEND,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_REALTIME_WINDOW,
+    DEFAULT_REQUEST_PROFILE,
+    DEFAULT_REFRESH_JITTER,
+    DEFAULT_SETUP_CONCURRENCY,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_STATION_CACHE_TTL,
+    DEFAULT_STATION_LOOKUP_TIMEOUT,
+)
+from .quota import QuotaPlanner, QuotaTracker, async_get_quota_tracker
+from .filters import DepartureFilter
+from .horizon import DepartureHorizon
+from .scheduler import AdaptiveInterval, RefreshScheduler
+from .station_cache import StationCache, async_get_station_cache
 
 _LOGGER = logging.getLogger(__name__)
 
+STOP = "stop"
+TRIP = "trip"
+QUOTA = "quota"
+
+
+async def async_resolve_time_zone(hass: HomeAssistant, name: str) -> tzinfo | None:
+    """Return the time zone by IANA name, or None if it is unknown.
+
+    Loading a zone reads from disk, so it is not done on the event loop.
+    """
+    if hasattr(dt_util, "async_get_time_zone"):
+        return await dt_util.async_get_time_zone(name)
+    return await hass.async_add_executor_job(dt_util.get_time_zone, name)
+
 
 class TriasDataUpdateCoordinator(DataUpdateCoordinator):
     """Get the latest data from the API."""
@@ -34,11 +80,43 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
         update_interval: int,
     ) -> None:
         """Initialize the data object."""
+        # The coordinator itself does not poll. After the first refresh every
+        # stop and trip is refreshed on its own timeline by the scheduler.
+        min_interval = timedelta(
+            seconds=entry.options.get("min_scan_interval", update_interval * 60)
+        )
+        max_interval = timedelta(
+            seconds=entry.options.get("max_scan_interval", DEFAULT_MAX_SCAN_INTERVAL)
+        )
+
         super().__init__(
             hass=hass,
             logger=logger,
             name=name,
-            update_interval=timedelta(minutes=update_interval),
+            update_interval=None,
+        )
+
+        self._intervals = AdaptiveInterval(min_interval, max_interval)
+        self._scheduler = RefreshScheduler(hass, self._handle_scheduled_refresh)
+        self._refresh_intervals: dict = entry.options.get("refresh_intervals", {})
+        self._refresh_priorities: dict = entry.options.get("refresh_priorities", {})
+        self._daily_quota: int = entry.options.get("daily_quota", DEFAULT_DAILY_QUOTA)
+        self.quota: QuotaPlanner | None = None
+        self._refresh_jitter: int = entry.options.get(
+            "refresh_jitter", DEFAULT_REFRESH_JITTER
+        )
+        self._delay_threshold: int = entry.options.get(
+            "delay_threshold", DEFAULT_DELAY_THRESHOLD
+        )
+        self._horizon = timedelta(minutes=entry.options.get("horizon", DEFAULT_HORIZON))
+        self._horizon_results: int = entry.options.get(
+            "horizon_results", DEFAULT_HORIZON_RESULTS
+        )
+        self._realtime_window = timedelta(
+            minutes=entry.options.get("realtime_window", DEFAULT_REALTIME_WINDOW)
+        )
+        self._stale_window = timedelta(
+            seconds=entry.options.get("stale_window", DEFAULT_STALE_WINDOW)
         )
 
         self._hass = hass
@@ -56,15 +134,68 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
             )
         except ValueError:
             self._auth_method = AuthMethod.REQUEST
+        # Tried in order after the primary url, per endpoint health
+        self._fallback_urls: list[str] = [
+            url for url in entry.options.get("fallback_urls", []) if url
+        ]
+        self._endpoint_auth_methods: dict[str, str] = entry.options.get(
+            "endpoint_auth_methods", {}
+        )
+        self._parser_backend: str = entry.options.get(
+            "parser_backend", DEFAULT_PARSER_BACKEND
+        )
+        self._request_profile: str = entry.options.get(
+            "request_profile", DEFAULT_REQUEST_PROFILE
+        )
+        self._time_zone: str = entry.options.get("time_zone") or hass.config.time_zone
+        self._parse_workers: int = entry.options.get(
+            "parse_workers", DEFAULT_PARSE_WORKERS
+        )
+        self._offload_threshold: int = entry.options.get(
+            "offload_threshold", DEFAULT_OFFLOAD_THRESHOLD_KIB
+        )
+
+        self._rate_limit: float = entry.options.get("rate_limit", DEFAULT_RATE_LIMIT)
+        self._rate_burst: int = entry.options.get("rate_burst", DEFAULT_RATE_BURST)
+        self._max_concurrent_requests: int = entry.options.get(
+            "max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+
+        self._max_retries: int = entry.options.get("max_retries", DEFAULT_MAX_RETRIES)
+        self._circuit_failure_threshold: int = entry.options.get(
+            "circuit_failure_threshold", DEFAULT_CIRCUIT_FAILURE_THRESHOLD
+        )
+        self._circuit_recovery_timeout: int = entry.options.get(
+            "circuit_recovery_timeout", DEFAULT_CIRCUIT_RECOVERY_TIMEOUT
+        )
+
+        self._hedge_percentile: float = entry.options.get(
+            "hedge_percentile", DEFAULT_HEDGE_PERCENTILE
+        )
+
+        self._station_cache_ttl: float = (
+            entry.options.get("station_cache_ttl", DEFAULT_STATION_CACHE_TTL) * 86400
+        )
+        self._station_cache: StationCache | None = None
+        self._setup_concurrency: int = entry.options.get(
+            "setup_concurrency", DEFAULT_SETUP_CONCURRENCY
+        )
+        self._station_lookup_timeout: int = entry.options.get(
+            "station_lookup_timeout", DEFAULT_STATION_LOOKUP_TIMEOUT
+        )
 
         # Async Client wird später erstellt
         self.client: AsyncTriasClient | None = None
 
         self.stop_ids: list[str] = entry.options.get("stop_ids", [])
+        self._stop_filters: dict[str, dict] = entry.options.get("stop_filters", {})
         self.departure_limit: str = entry.options.get(
             "departure_limit_config", DEFAULT_DEPARTURE_LIMIT
         )
         self.stops: dict[dict] = {}
+        self.countdown_interval = timedelta(
+            seconds=entry.options.get("countdown_interval", DEFAULT_COUNTDOWN_INTERVAL)
+        )
 
         self.trip_list: dict = entry.options.get("trips", {})
         # {
@@ -77,19 +208,130 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
     async def _ensure_client(self):
         """Ensure async client is created."""
         if self.client is None:
-            _LOGGER.debug("Creating aiohttp session for Trias client")
-            session = aiohttp.ClientSession()
+            # The client takes a session shared by all entries of this endpoint
+            time_zone = await async_resolve_time_zone(self.hass, self._time_zone)
+            if time_zone is None:
+                _LOGGER.warning(
+                    "Unknown time zone %s, using %s instead",
+                    self._time_zone,
+                    self.hass.config.time_zone,
+                )
+                time_zone = dt_util.DEFAULT_TIME_ZONE
 
             self.client = AsyncTriasClient(
                 api_key=self._api_key,
                 url=self._url,
-                session=session,
                 auth_method=self._auth_method,
+                parser_backend=self._parser_backend,
+                profile=self._request_profile,
+                time_zone=time_zone,
+                parse_workers=int(self._parse_workers),
+                offload_threshold=int(self._offload_threshold) * 1024,
+                rate_limit=float(self._rate_limit),
+                rate_burst=int(self._rate_burst),
+                max_concurrent=int(self._max_concurrent_requests),
+                max_retries=int(self._max_retries),
+                failure_threshold=int(self._circuit_failure_threshold),
+                recovery_timeout=float(self._circuit_recovery_timeout),
+                hedge_percentile=float(self._hedge_percentile),
+                fallback_urls=self._fallback_urls,
+                auth_methods={
+                    url: AuthMethod(method)
+                    for url, method in self._endpoint_auth_methods.items()
+                    if url in self._fallback_urls and method in list(AuthMethod)
+                },
+            )
+
+    async def _async_get_station_data(self, location_id: str) -> dict:
+        """Get station data from the cache, falling back to the API.
+
+        Expired entries are returned as well and refreshed in the background,
+        so setup does not wait for (or fail on) the API for known stations.
+        """
+        cached = self._station_cache.get(
+            self._url, location_id, self._station_cache_ttl
+        )
+        if cached is not None:
+            station_data, fresh = cached
+            if not fresh:
+                self._entry.async_create_background_task(
+                    self.hass,
+                    self._async_refresh_station_data(location_id),
+                    f"{self.name} refresh station {location_id}",
+                )
+            return station_data
+
+        station_data = await self.client.async_get_station_data(location_id)
+        self._station_cache.set(self._url, location_id, station_data)
+        return station_data
+
+    async def _async_refresh_station_data(self, location_id: str) -> None:
+        """Refresh a cached station in the background."""
+        try:
+            station_data = await self.client.async_get_station_data(
+                location_id, PRIORITY_LOW
             )
+        except Exception as error:  # pylint: disable=broad-except
+            _LOGGER.debug("Could not refresh station %s: %s", location_id, error)
+            return
+        self._station_cache.set(self._url, location_id, station_data)
+
+    async def _async_resolve_stations(self, location_ids: list[str]) -> dict:
+        """Look up all stations concurrently.
+
+        Returns a dict mapping each location id to its station data or to the
+        exception raised while looking it up.
+        """
+        semaphore = asyncio.Semaphore(self._setup_concurrency)
+
+        async def _lookup(location_id: str):
+            async with semaphore:
+                try:
+                    async with async_timeout.timeout(self._station_lookup_timeout):
+                        return await self._async_get_station_data(location_id)
+                except asyncio.TimeoutError:
+                    return ApiError("Station lookup timeout")
+                except Exception as error:  # pylint: disable=broad-except
+                    return error
+
+        # dict.fromkeys drops duplicates shared between stops and trips
+        unique_ids = list(dict.fromkeys(location_ids))
+        results = await asyncio.gather(*(_lookup(item) for item in unique_ids))
+        return dict(zip(unique_ids, results))
 
     async def setup(self) -> bool:
         """Set up the Trias API."""
         await self._ensure_client()
+        self._station_cache = await async_get_station_cache(self.hass)
+        if self._daily_quota:
+            tracker = await async_get_quota_tracker(self.hass)
+            self.quota = QuotaPlanner(
+                tracker, QuotaTracker.key(self._url, self._api_key), self._daily_quota
+            )
+            self.client.on_request = self.quota.record
+            self._entry.async_on_unload(tracker.register(self.quota))
+        self._entry.async_on_unload(self._scheduler.async_shutdown)
+
+        trip_locations = {}
+        for trip_name, locations in self.trip_list.items():
+            if "origin" in locations and "destination" in locations:
+                # New format
+                trip_locations[trip_name] = (
+                    locations["origin"]["id"],
+                    locations["origin"].get("name", ""),
+                    locations["destination"]["id"],
+                    locations["destination"].get("name", ""),
+                )
+            else:
+                # Old format
+                from_location_id, to_location_id = list(locations.keys())
+                trip_locations[trip_name] = (from_location_id, "", to_location_id, "")
+
+        location_ids = list(self.stop_ids)
+        for from_location_id, _, to_location_id, _ in trip_locations.values():
+            location_ids += [from_location_id, to_location_id]
+
+        stations = await self._async_resolve_stations(location_ids)
 
         stop_id_dict = {}
 
@@ -99,27 +341,26 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
                 "created": False,
                 "ok": True,
                 "prevestly_ok": False,
+                "next_refresh": None,
+                "horizon": (DepartureHorizon(self._horizon) if self._horizon else None),
+                "filter": DepartureFilter.from_config(self._stop_filters.get(stop_id)),
                 "attrs": {},
                 "data": {},
             }
 
-            try:
-                station_data = await self.client.async_get_station_data(stop_id)
-            except ApiError as error:
-                _LOGGER.error("Could not request data for %s reason %s", stop_id, error)
-                stop_dict["ok"] = False
-                continue
-            except InvalidLocationName as error:
-                _LOGGER.error("Could not request data for %s reason %s", stop_id, error)
-                stop_dict["ok"] = False
+            station_data = stations[stop_id]
+            if isinstance(station_data, (ApiError, InvalidLocationName)):
+                _LOGGER.error(
+                    "Could not request data for %s reason %s", stop_id, station_data
+                )
                 continue
-            except HttpError as error:
-                _LOGGER.error(f"Http error {error.status_code}:\n{error.response}")
-                stop_dict["ok"] = False
+            if isinstance(station_data, HttpError):
+                _LOGGER.error(
+                    f"Http error {station_data.status_code}:\n{station_data.response}"
+                )
                 continue
-            except Exception as error:
-                _LOGGER.error(f"Unexpected error for {stop_id}: {error}")
-                stop_dict["ok"] = False
+            if isinstance(station_data, Exception):
+                _LOGGER.error(f"Unexpected error for {stop_id}: {station_data}")
                 continue
 
             stop_dict["name"] = (
@@ -152,43 +393,46 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.info("Updated stop infos: \n%s", stop_id_dict)
             self.hass.config_entries.async_update_entry(self._entry, options=options)
 
-        if self._auth_method != self.client.auth_method:
+        endpoint_auth_methods = {
+            url: method
+            for url, method in self.client.auth_methods.items()
+            if url in self._fallback_urls
+        }
+        if (
+            self._auth_method != self.client.auth_method
+            or self._endpoint_auth_methods != endpoint_auth_methods
+        ):
             options = dict(self._entry.options)
             options["auth_method"] = self.client.auth_method
+            options["endpoint_auth_methods"] = endpoint_auth_methods
             self.hass.config_entries.async_update_entry(self._entry, options=options)
 
-        for trip_name, locations in self.trip_list.items():
+        for trip_name, (
+            from_location_id,
+            from_location_name,
+            to_location_id,
+            to_location_name,
+        ) in trip_locations.items():
             trip_id = trip_name.lower().replace(" ", "-")
 
-            if "origin" in locations and "destination" in locations:
-                # New format
-                from_location_id = locations["origin"]["id"]
-                from_location_name = locations["origin"].get("name", "")
-                to_location_id = locations["destination"]["id"]
-                to_location_name = locations["destination"].get("name", "")
-            else:
-                # Old format
-                ids = list(locations.keys())
-                from_location_id, to_location_id = ids
-                from_location_name, to_location_name = "", ""
+            from_station_data = stations[from_location_id]
+            to_station_data = stations[to_location_id]
 
-            try:
-                from_station_data = await self.client.async_get_station_data(
-                    from_location_id
-                )
-                to_station_data = await self.client.async_get_station_data(
-                    to_location_id
-                )
-
-            except ApiError as error:
+            error = next(
+                (
+                    item
+                    for item in (from_station_data, to_station_data)
+                    if isinstance(item, Exception)
+                ),
+                None,
+            )
+            if isinstance(error, (ApiError, InvalidLocationName)):
                 _LOGGER.error(
                     "Could not request data for %s reason %s", trip_name, error
                 )
                 continue
-            except InvalidLocationName as error:
-                _LOGGER.error(
-                    "Could not request data for %s reason %s", trip_name, error
-                )
+            if error is not None:
+                _LOGGER.error(f"Unexpected error for {trip_name}: {error}")
                 continue
 
             from_name = (
@@ -221,6 +465,7 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
                 "created": False,
                 "ok": True,
                 "prevestly_ok": False,
+                "next_refresh": None,
                 "name": trip_name,
                 "from": from_location_id,
                 "to": to_location_id,
@@ -234,6 +479,11 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
             self.trips[trip_id] = trip_dict
             self.add_trip(trip_dict)
 
+        if self.quota is not None:
+            self.quota.weights = {
+                key: self._item_priority(key) for key in self._item_keys()
+            }
+
         return True
 
     async def _async_update_data(self) -> dict:
@@ -274,21 +524,209 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
             # Teilweise Daten sind bereits aktualisiert
             pass
 
+        if self.quota is not None:
+            self.quota.record_refresh(len(self.stops) + len(self.trips))
+
+        for stop_id in self.stops:
+            self._schedule_item_refresh((STOP, stop_id))
+        for trip_id in self.trips:
+            self._schedule_item_refresh((TRIP, trip_id))
+
         return True
 
+    def _item_keys(self) -> list[tuple[str, str]]:
+        """Return the scheduler keys of all stops and trips."""
+        return [(STOP, stop_id) for stop_id in self.stops] + [
+            (TRIP, trip_id) for trip_id in self.trips
+        ]
+
+    def _item_priority(self, key: tuple[str, str]) -> float:
+        """Return the configured quota priority of a stop or trip."""
+        item = self._get_item(key)
+        name = item["id"] if key[0] == STOP else item["name"]
+        return max(0.01, float(self._refresh_priorities.get(name, 1)))
+
+    def _get_item(self, key: tuple[str, str]) -> dict | None:
+        """Return the stop or trip dict for a scheduler key."""
+        kind, item_id = key
+        return (self.stops if kind == STOP else self.trips).get(item_id)
+
+    def _schedule_item_refresh(self, key: tuple[str, str]) -> None:
+        """Schedule the next refresh of a stop or trip.
+
+        Refreshes follow the events of the next departure: the moment it
+        leaves, or a realtime delay change of at least the delay threshold.
+        A fixed interval configured for the stop (by id) or trip (by name)
+        takes precedence. With a daily quota, the interval is never shorter
+        than the item's share of the budget allows. Jitter spreads refreshes
+        that would otherwise fall on the same instant.
+        """
+        item = self._get_item(key)
+        if item is None:
+            return
+
+        if key[0] == STOP:
+            next_departure = item["data"].get("next_departure")
+            departures = item["attrs"].get("departures") or [{}]
+            delay = departures[0].get("DelaySeconds")
+            fixed_interval = self._refresh_intervals.get(item["id"])
+        else:
+            next_departure = item["data"].get("start")
+            delay = item["attrs"].get("DelaySeconds")
+            fixed_interval = self._refresh_intervals.get(item["name"])
+
+        now = dt_util.utcnow()
+        delay = delay or 0
+        delay_changed = (
+            item.get("last_delay") is not None
+            and abs(delay - item["last_delay"]) >= self._delay_threshold
+        )
+        item["last_delay"] = delay
+
+        if fixed_interval:
+            interval = timedelta(seconds=int(fixed_interval))
+        elif not item["ok"]:
+            interval = self._intervals.min_interval
+        else:
+            interval = self._intervals.next_interval(next_departure, now, delay_changed)
+
+        if self.quota is not None:
+            interval = max(interval, self.quota.min_interval(key, now))
+
+        self._scheduler.schedule(key, interval, self._refresh_jitter)
+        item["next_refresh"] = now + interval
+        _LOGGER.debug("Next refresh of %s in %s", item["id"], interval)
+
+    @callback
+    def _handle_scheduled_refresh(self, key: tuple[str, str]) -> None:
+        """Start the refresh of a stop or trip that is due."""
+        self._entry.async_create_background_task(
+            self.hass,
+            self._async_refresh_item(key),
+            f"{self.name} refresh {key[0]} {key[1]}",
+        )
+
+    async def _async_refresh_item(self, key: tuple[str, str]) -> None:
+        """Refresh one stop or trip and notify only its entities on change."""
+        item = self._get_item(key)
+        if item is None:
+            return
+
+        previous = (item["ok"], dict(item["data"]), dict(item["attrs"]))
+
+        try:
+            if key[0] == STOP:
+                await self._async_update_stop(key[1])
+            else:
+                await self._async_update_trip(key[1])
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Failed to refresh %s %s: %s", key[0], key[1], err)
+            item["ok"] = False
+            served = (
+                self._serve_stale_stop(item)
+                if key[0] == STOP
+                else self._serve_stale(item)
+            )
+            if not served:
+                item["data"] = {}
+
+        # Not rescheduled when cancelled, e.g. on unload
+        if self.quota is not None:
+            self.quota.record_refresh()
+        self._schedule_item_refresh(key)
+
+        if previous != (item["ok"], item["data"], item["attrs"]):
+            self._async_notify_listeners(key)
+        if self.quota is not None:
+            self._async_notify_listeners(QUOTA)
+
+    @callback
+    def _async_notify_listeners(self, key: tuple[str, str] | str) -> None:
+        """Update the entities of one stop or trip, or the quota entities."""
+        for update_callback, context in list(self._listeners.values()):
+            if context == key:
+                update_callback()
+
+    async def _async_fetch_departures(
+        self,
+        stop_id: str,
+        number_results: int,
+        dt=None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> list[Departure]:
+        """Fetch the departures of a stop that pass its filter."""
+        departure_filter: DepartureFilter | None = self.stops[stop_id]["filter"]
+        if departure_filter is None:
+            return await self.client.async_get_departures(
+                stop_id, number_results, dt, priority
+            )
+
+        departures = await self.client.async_get_departures(
+            stop_id,
+            number_results,
+            dt,
+            priority,
+            modes=departure_filter.modes,
+            line_refs=departure_filter.line_refs,
+        )
+        return departure_filter.apply(departures)
+
+    async def _async_get_stop_departures(self, stop_id: str) -> list[Departure]:
+        """Return the next departures of a stop, using its horizon cache.
+
+        The horizon is fetched with a larger number of results and sliced
+        locally. Only the next departures are requested again, and only while
+        the first one is within the realtime window. When the horizon runs
+        short it is extended from its last departure using DepArrTime.
+        """
+        limit = int(self.departure_limit)
+        horizon: DepartureHorizon | None = self.stops[stop_id]["horizon"]
+        if horizon is None:
+            departure_filter: DepartureFilter | None = self.stops[stop_id]["filter"]
+            # Filtering locally drops results, fetch enough to fill the limit
+            number_results = (
+                max(self._horizon_results, limit)
+                if departure_filter is not None and departure_filter.local_only
+                else limit
+            )
+            departures = await self._async_fetch_departures(stop_id, number_results)
+            return departures[:limit]
+
+        now = dt_util.utcnow()
+        upcoming = horizon.upcoming(now)
+
+        if horizon.expired(now) or not upcoming:
+            departures = await self._async_fetch_departures(
+                stop_id, max(self._horizon_results, limit)
+            )
+            horizon.replace(departures, now, limit)
+        elif len(upcoming) < limit:
+            departures = await self._async_fetch_departures(
+                stop_id, self._horizon_results, upcoming[-1].timetabled_time
+            )
+            horizon.extend(departures)
+        elif upcoming[0].departure_time - now <= self._realtime_window:
+            departures = await self._async_fetch_departures(
+                stop_id, limit, priority=PRIORITY_HIGH
+            )
+            horizon.merge_realtime(departures)
+        else:
+            _LOGGER.debug("Serving departures of %s from the horizon", stop_id)
+
+        return horizon.departures[:limit]
+
     async def _async_update_stop(self, stop_id: str):
         """Update a single stop asynchronously with all attributes."""
         self.stops[stop_id]["prevestly_ok"] = self.stops[stop_id]["ok"]
 
         try:
             async with async_timeout.timeout(30):  # 30s pro Stop
-                departures = await self.client.async_get_departures(
-                    stop_id, int(self.departure_limit)
-                )
+                departures = await self._async_get_stop_departures(stop_id)
         except (asyncio.TimeoutError, ApiError) as err:
             _LOGGER.warning(f"Failed to update stop {stop_id}: {err}")
             self.stops[stop_id]["ok"] = False
-            self.stops[stop_id]["data"] = {}
+            if not self._serve_stale_stop(self.stops[stop_id]):
+                self.stops[stop_id]["data"] = {}
             return
 
         # GENAU DAS GLEICHE VERHALTEN WIE IM ALTEN CODE
@@ -297,47 +735,14 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
             self.stops[stop_id]["data"] = {}
             return
 
-        data = {}
-
-        # Nächste Abfahrt (genau wie im alten Code)
-        if departures[0]["EstimatedTime"]:
-            data["next_departure"] = departures[0]["EstimatedTime"]
-        else:
-            data["next_departure"] = departures[0]["TimetabledTime"]
-
-        # Departure-Liste mit allen Attributen (genau wie im alten Code)
-        departure_attr = []
-        for departure in departures:
-            departure_attr.append(
-                {
-                    "Mode": departure["mode"],
-                    "StopPointName": departure["StopPointName"],
-                    "LineName": departure["LineName"],
-                    "DestinationText": departure["DestinationText"],
-                    "StartTime": departure["EstimatedTime"]
-                    or departure["TimetabledTime"],
-                    "TimetabledTime": departure["TimetabledTime"],
-                    "EstimatedTime": departure["EstimatedTime"],
-                    "PlannedBay": departure.get("PlannedBay"),
-                    "Delay": (
-                        str(departure["Delay"]) if departure.get("Delay") else None
-                    ),
-                    "DelaySeconds": (
-                        int(departure["Delay"].total_seconds())
-                        if departure.get("Delay") is not None
-                        else 0
-                    ),
-                    "DelayMinutes": (
-                        int(departure["Delay"].total_seconds() / 60)
-                        if departure.get("Delay") is not None
-                        else 0
-                    ),
-                }
-            )
+        data = {"next_departure": departures[0].departure_time}
 
         self.stops[stop_id]["data"] = data
-        self.stops[stop_id]["attrs"]["departures"] = departure_attr
+        self.stops[stop_id]["attrs"]["departures"] = [
+            departure.as_attributes() for departure in departures
+        ]
         self.stops[stop_id]["ok"] = True
+        self._mark_fresh(self.stops[stop_id])
 
     async def _async_update_trip(self, trip_id: str):
         """Update a single trip asynchronously with all attributes."""
@@ -352,7 +757,8 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
         except (asyncio.TimeoutError, ApiError) as err:
             _LOGGER.warning(f"Failed to update trip {trip_id}: {err}")
             self.trips[trip_id]["ok"] = False
-            self.trips[trip_id]["data"] = {}
+            if not self._serve_stale(self.trips[trip_id]):
+                self.trips[trip_id]["data"] = {}
             return
 
         # GENAU DAS GLEICHE VERHALTEN WIE IM ALTEN CODE
@@ -371,78 +777,14 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
             return
 
         # Erster Trip wird als Hauptwert verwendet (wie im alten Code)
-        first_trip = trips[0]
-
-        # Daten für den Haupt-Sensorwert (erster Trip)
-        if first_trip.get("EstimatedStartTime"):
-            next_departure = first_trip["EstimatedStartTime"]
-        else:
-            next_departure = first_trip["StartTime"]
-
-        trip_data = {"start": next_departure}
-
-        # Attributes für den ersten Trip (wie im alten Code)
-        attr = {
-            "StartTime": first_trip["StartTime"],
-            "TimetabledStartTime": first_trip["StartTimetabledTime"],
-            "EstimatedStartTime": first_trip.get("StartEstimatedTime"),
-            "EndTime": first_trip["EndTime"],
-            "TimetabledEndTime": first_trip.get("EndTimetabledTime"),
-            "EstimatedEndTime": first_trip.get("EstimatedEndTime"),
-            "Interchanges": first_trip["Interchanges"],
-            "LineName": first_trip["Transportation"][0]["LineName"],
-            "DestinationText": first_trip["Transportation"][0]["DestinationText"],
-            "Duration": first_trip["Duration"],
-            "Delay": (str(first_trip["Delay"]) if first_trip.get("Delay") else None),
-            "DelaySeconds": (
-                int(first_trip["Delay"].total_seconds())
-                if first_trip.get("Delay") is not None
-                else 0
-            ),
-            "DelayMinutes": (
-                int(first_trip["Delay"].total_seconds() / 60)
-                if first_trip.get("Delay") is not None
-                else 0
-            ),
-        }
+        trip_data = {"start": trips[0].departure_time}
+        trip_attrs = [trip.as_attributes() for trip in trips]
+        attr = dict(trip_attrs[0])
 
         # Weitere Trips als departures-Liste (wie im alten Code)
-        departures = []
-        for idx, trip in enumerate(trips):
-            trip_info = {
-                "index": idx,
-                "StartTime": trip["StartTime"],
-                "TimetabledStartTime": trip["StartTimetabledTime"],
-                "EstimatedStartTime": trip.get("StartEstimatedTime"),
-                "EndTime": trip["EndTime"],
-                "TimetabledEndTime": trip.get("EndTimetabledTime"),
-                "EstimatedEndTime": trip.get("EstimatedEndTime"),
-                "Interchanges": trip["Interchanges"],
-                "LineName": trip["Transportation"][0]["LineName"],
-                "DestinationText": trip["Transportation"][0]["DestinationText"],
-                "Duration": trip["Duration"],
-                "Delay": (str(trip["Delay"]) if trip.get("Delay") else None),
-                "DelaySeconds": (
-                    int(trip["Delay"].total_seconds())
-                    if trip.get("Delay") is not None
-                    else 0
-                ),
-                "DelayMinutes": (
-                    int(trip["Delay"].total_seconds() / 60)
-                    if trip.get("Delay") is not None
-                    else 0
-                ),
-            }
-
-            # Berechne Verzögerung für Abfahrt (wie im alten Code)
-            if trip_info.get("EstimatedStartTime") and trip_info.get("StartTime"):
-                delay = trip_info["EstimatedStartTime"] - trip_info["StartTime"]
-                trip_info["CurrentDelay"] = str(delay)
-                trip_info["CurrentDelayMinutes"] = int(delay.total_seconds() / 60)
-
-            departures.append(trip_info)
-
-        attr["departures"] = departures
+        attr["departures"] = [
+            {"index": idx, **attrs} for idx, attrs in enumerate(trip_attrs)
+        ]
 
         # Füge zusätzlich die Anzahl der verfügbaren Trips hinzu
         attr["available_trips"] = len(trips)
@@ -450,10 +792,54 @@ class TriasDataUpdateCoordinator(DataUpdateCoordinator):
         self.trips[trip_id]["data"] = trip_data
         self.trips[trip_id]["attrs"].update(attr)
         self.trips[trip_id]["ok"] = True
+        self._mark_fresh(self.trips[trip_id])
+
+    def _mark_fresh(self, item: dict) -> None:
+        """Remember when a stop or trip was last updated successfully."""
+        item["last_update"] = dt_util.utcnow()
+        item["attrs"]["is_stale"] = False
+        item["attrs"]["age_seconds"] = 0
+
+    def _serve_stale(self, item: dict) -> bool:
+        """Keep the last good data of a stop or trip after a failed update.
+
+        Returns False if there is no data younger than the staleness window,
+        in which case the caller clears the data. The scheduler retries failed
+        items at the minimum interval, which revalidates the cached data.
+        """
+        last_update = item.get("last_update")
+        if last_update is None or not item["data"]:
+            return False
+
+        age = dt_util.utcnow() - last_update
+        if age > self._stale_window:
+            return False
+
+        item["attrs"]["is_stale"] = True
+        item["attrs"]["age_seconds"] = int(age.total_seconds())
+        return True
+
+    def _serve_stale_stop(self, stop: dict) -> bool:
+        """Keep the last good departures of a stop that have not left yet."""
+        if not self._serve_stale(stop):
+            return False
+
+        now = dt_util.utcnow()
+        departures = [
+            departure
+            for departure in stop["attrs"].get("departures", [])
+            if departure["StartTime"] and departure["StartTime"] >= now
+        ]
+        if not departures:
+            return False
+
+        stop["attrs"]["departures"] = departures
+        stop["data"] = {"next_departure": departures[0]["StartTime"]}
+        return True
 
-    def _is_trip_in_past(self, trip: dict, tolerance_seconds: int = 30) -> bool:
+    def _is_trip_in_past(self, trip: Trip, tolerance_seconds: int = 30) -> bool:
         """Return True if a trip start time is older than now minus tolerance."""
-        start_time = trip.get("StartEstimatedTime") or trip.get("StartTime")
+        start_time = trip.departure_time
         if start_time is None:
             return False
 
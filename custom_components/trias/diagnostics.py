@@ -0,0 +1,39 @@
+"""Diagnostics support for the Trias API integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .station_cache import async_get_station_cache
+from .trias_client.session import SESSIONS
+
+TO_REDACT = {"api_key"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    station_cache = await async_get_station_cache(hass)
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "client": coordinator.client.diagnostics() if coordinator.client else None,
+        "sessions": SESSIONS.diagnostics(),
+        "cached_stations": len(station_cache),
+        "quota": (
+            coordinator.quota.diagnostics(dt_util.utcnow())
+            if coordinator.quota
+            else None
+        ),
+    }
@@ -11,9 +11,13 @@ class TriasCoordinatorEntity(CoordinatorEntity):
 
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator, sensor: dict) -> None:
-        """Initialize the Trias base entity."""
-        super().__init__(coordinator)
+    def __init__(self, coordinator, sensor: dict, context=None) -> None:
+        """Initialize the Trias base entity.
+
+        The context identifies the stop or trip, so the coordinator can update
+        only the entities whose data changed.
+        """
+        super().__init__(coordinator, context)
         self._attr_name = f"{coordinator.name} {sensor['name']}"
         self._attr_extra_state_attributes = {ATTR_ATTRIBUTION: ATTRIBUTION}
         # self._attr_device_info = DeviceInfo(
@@ -0,0 +1,81 @@
+"""Per-stop departure filters."""
+
+from __future__ import annotations
+
+from .trias_client.models import Departure
+
+
+def _as_list(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(item) for item in value]
+
+
+class DepartureFilter:
+    """Filter the departures of a stop by mode, line and destination.
+
+    Modes and line references are sent with the request, so the endpoint
+    only returns matching departures. Line names and destinations cannot be
+    expressed in a StopEventRequest and are only filtered locally. Every
+    departure is checked locally as well, in case an endpoint ignores a
+    filter. A departure has to match each configured criterion, and any of
+    the values given for it.
+    """
+
+    def __init__(
+        self,
+        modes: list[str] | None = None,
+        line_refs: list[str] | None = None,
+        lines: list[str] | None = None,
+        destinations: list[str] | None = None,
+    ) -> None:
+        """Initialize the filter."""
+        self.modes = _as_list(modes)
+        self.line_refs = _as_list(line_refs)
+        self._lines = {line.casefold() for line in _as_list(lines)}
+        self._destinations = [
+            destination.casefold() for destination in _as_list(destinations)
+        ]
+
+    @classmethod
+    def from_config(cls, config: dict | None) -> DepartureFilter | None:
+        """Return the filter of a stop from its options, if one is set."""
+        if not config:
+            return None
+        departure_filter = cls(
+            config.get("modes"),
+            config.get("line_refs"),
+            config.get("lines"),
+            config.get("destinations"),
+        )
+        return departure_filter if departure_filter.active else None
+
+    @property
+    def active(self) -> bool:
+        """Return True if any criterion is set."""
+        return bool(self.modes or self.line_refs or self._lines or self._destinations)
+
+    @property
+    def local_only(self) -> bool:
+        """Return True if some criteria cannot be sent with the request."""
+        return bool(self._lines or self._destinations)
+
+    def matches(self, departure: Departure) -> bool:
+        """Return True if the departure passes the filter."""
+        if self.modes and departure.mode not in self.modes:
+            return False
+        if self.line_refs and departure.line_ref not in self.line_refs:
+            return False
+        if self._lines and departure.line_name.casefold() not in self._lines:
+            return False
+        if self._destinations:
+            destination = departure.destination_text.casefold()
+            if not any(part in destination for part in self._destinations):
+                return False
+        return True
+
+    def apply(self, departures: list[Departure]) -> list[Departure]:
+        """Return the departures that pass the filter."""
+        return [departure for departure in departures if self.matches(departure)]
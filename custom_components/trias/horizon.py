@@ -0,0 +1,82 @@
+"""Rolling horizon cache of the departures at a stop."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+from .trias_client.models import Departure
+
+_by_time = attrgetter("departure_time")
+
+
+def _departure_key(departure: Departure) -> tuple:
+    return (
+        departure.journey_ref or departure.line_name,
+        departure.timetabled_time,
+    )
+
+
+class DepartureHorizon:
+    """Departures of a stop for a window ahead, fetched in one request.
+
+    The window is fetched rarely and sliced locally. Realtime updates of the
+    next departures are merged in by journey, and departures that have left
+    are dropped as time goes by.
+    """
+
+    def __init__(self, window: timedelta) -> None:
+        """Initialize an empty horizon."""
+        self.window = window
+        self.departures: list[Departure] = []
+        self.fetched: datetime | None = None
+
+    def expired(self, now: datetime) -> bool:
+        """Return True once half of the window has passed since the fetch."""
+        return self.fetched is None or now - self.fetched > self.window / 2
+
+    def upcoming(self, now: datetime) -> list[Departure]:
+        """Drop departures that have left and return the remaining ones."""
+        self.departures = [d for d in self.departures if d.departure_time >= now]
+        return self.departures
+
+    def replace(self, departures: list[Departure], now: datetime, keep: int) -> None:
+        """Store a newly fetched window, keeping at least keep departures."""
+        end = now + self.window
+        self.departures = [
+            departure
+            for index, departure in enumerate(departures)
+            if index < keep or departure.departure_time <= end
+        ]
+        self.fetched = now
+
+    def extend(self, departures: list[Departure]) -> None:
+        """Append departures fetched from the end of the window."""
+        known = {_departure_key(departure) for departure in self.departures}
+        self.departures.extend(
+            departure
+            for departure in departures
+            if _departure_key(departure) not in known
+        )
+        self.departures.sort(key=_by_time)
+
+    def merge_realtime(self, departures: list[Departure]) -> None:
+        """Merge freshly fetched next departures into the window.
+
+        Cached departures before the last fresh one that are missing from the
+        fresh results have left or were cancelled, so they are dropped.
+        """
+        if not departures:
+            return
+
+        fresh = {_departure_key(departure): departure for departure in departures}
+        cutoff = max(departure.departure_time for departure in departures)
+        merged = list(departures)
+        merged.extend(
+            departure
+            for departure in self.departures
+            if _departure_key(departure) not in fresh
+            and departure.departure_time > cutoff
+        )
+        merged.sort(key=_by_time)
+        self.departures = merged
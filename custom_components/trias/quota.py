@@ -0,0 +1,236 @@
+"""Daily request quota accounting and planning."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta
+import hashlib
+import logging
+from typing import Any
+
+from yarl import URL
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.quota"
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # Seconds
+
+DATA_QUOTA_TRACKER = f"{DOMAIN}_quota_tracker"
+
+# Share of the budget spent in each local hour, relative to daytime hours
+HOURLY_WEIGHTS = (
+    (0.2,) * 5  # 0-4: night
+    + (0.6,)  # 5
+    + (1.5,) * 4  # 6-9: morning peak
+    + (1.0,) * 6  # 10-15
+    + (1.5,) * 4  # 16-19: evening peak
+    + (0.6,) * 3  # 20-22
+    + (0.3,)  # 23
+)
+
+# Weight of past refreshes in the average number of requests per refresh,
+# applied once per refresh
+REQUEST_COST_DECAY = 0.95
+
+
+class QuotaTracker:
+    """Count requests per endpoint and api key and day, across restarts.
+
+    Counters are kept per local day and start over at midnight. Api keys
+    are only stored hashed. The planners of all config entries are
+    registered by key, so entries sharing a key share its budget.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the tracker."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._usage: dict[str, dict[str, Any]] = {}
+        self._planners: dict[str, list[QuotaPlanner]] = {}
+
+    async def async_load(self) -> None:
+        """Load the counters from disk."""
+        data = await self._store.async_load()
+        if data:
+            self._usage = data.get("usage", {})
+
+    @staticmethod
+    def key(url: str, api_key: str) -> str:
+        """Return the key requests are counted by."""
+        digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+        return f"{URL(url).origin()}|{digest}"
+
+    @staticmethod
+    def _today() -> str:
+        return dt_util.now().date().isoformat()
+
+    def used(self, key: str) -> int:
+        """Return the number of requests made today."""
+        usage = self._usage.get(key)
+        if usage is None or usage["day"] != self._today():
+            return 0
+        return usage["used"]
+
+    def record(self, key: str, count: int = 1) -> None:
+        """Count requests made just now."""
+        today = self._today()
+        usage = self._usage.get(key)
+        if usage is None or usage["day"] != today:
+            usage = self._usage[key] = {"day": today, "used": 0}
+        usage["used"] += count
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"usage": self._usage}
+
+    def register(self, planner: QuotaPlanner) -> Callable[[], None]:
+        """Add the planner of a config entry, return a callback to remove it."""
+        planners = self._planners.setdefault(planner.key, [])
+        planners.append(planner)
+
+        def unregister() -> None:
+            planners.remove(planner)
+            if not planners:
+                del self._planners[planner.key]
+
+        return unregister
+
+    def total_weight(self, key: str) -> float:
+        """Return the summed priorities of all items using the key."""
+        return sum(
+            sum(planner.weights.values()) for planner in self._planners.get(key, [])
+        )
+
+
+@singleton(DATA_QUOTA_TRACKER)
+async def async_get_quota_tracker(hass: HomeAssistant) -> QuotaTracker:
+    """Return the quota tracker shared by all config entries."""
+    tracker = QuotaTracker(hass)
+    await tracker.async_load()
+    return tracker
+
+
+def _weighted_seconds(start: datetime, end: datetime) -> float:
+    """Return the seconds between start and end, weighted by hour of day."""
+    total = 0.0
+    current = start
+    while current < end:
+        hour_end = current.replace(minute=0, second=0, microsecond=0) + timedelta(
+            hours=1
+        )
+        chunk_end = min(hour_end, end)
+        total += (chunk_end - current).total_seconds() * HOURLY_WEIGHTS[current.hour]
+        current = chunk_end
+    return total
+
+
+class QuotaPlanner:
+    """Spread the remaining daily budget over the rest of the day.
+
+    The budget available right now is the remaining budget times the weight
+    of the current hour, divided by the weighted time left until midnight.
+    Each stop or trip gets a share of it by its priority, relative to the
+    items of all entries using the same key. Divided by the average number
+    of requests a refresh takes, this sets a lower bound on the refresh
+    interval of the item.
+    """
+
+    def __init__(self, tracker: QuotaTracker, key: str, daily_quota: int) -> None:
+        """Initialize the planner."""
+        self._tracker = tracker
+        self.key = key
+        self.daily_quota = daily_quota
+        self.weights: dict[Hashable, float] = {}
+        self._pending = 0
+        self._requests = 0.0
+        self._refreshes = 0.0
+
+    def record(self, count: int = 1) -> None:
+        """Count requests made just now."""
+        self._tracker.record(self.key, count)
+        self._pending += count
+
+    def record_refresh(self, count: int = 1) -> None:
+        """Count finished refreshes, they took the requests made since the last."""
+        decay = REQUEST_COST_DECAY**count
+        self._requests = self._requests * decay + self._pending
+        self._refreshes = self._refreshes * decay + count
+        self._pending = 0
+
+    @property
+    def requests_per_refresh(self) -> float:
+        """Return the average number of requests a refresh takes, at least 1."""
+        if not self._refreshes:
+            return 1.0
+        return max(1.0, self._requests / self._refreshes)
+
+    def share(self, item: Hashable) -> float:
+        """Return the share of the budget of an item of this entry."""
+        total = self._tracker.total_weight(self.key)
+        return self.weights.get(item, 0) / total if total else 0.0
+
+    @property
+    def used(self) -> int:
+        """Return the number of requests made today."""
+        return self._tracker.used(self.key)
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of requests left for today."""
+        return max(0, self.daily_quota - self.used)
+
+    @staticmethod
+    def _midnight(now: datetime) -> datetime:
+        return dt_util.start_of_local_day(now) + timedelta(days=1)
+
+    def budget_rate(self, now: datetime) -> float:
+        """Return the requests per second that can be spent right now."""
+        now = dt_util.as_local(now)
+        weighted = _weighted_seconds(now, self._midnight(now))
+        if weighted <= 0:
+            return float(self.remaining)
+        return self.remaining * HOURLY_WEIGHTS[now.hour] / weighted
+
+    def min_interval(self, item: Hashable, now: datetime) -> timedelta:
+        """Return the shortest refresh interval of an item within its share."""
+        rate = self.budget_rate(now) * self.share(item)
+        if rate <= 0:
+            return self._midnight(dt_util.as_local(now)) - now
+        return timedelta(seconds=self.requests_per_refresh / rate)
+
+    def projected_exhaustion(self, now: datetime) -> datetime | None:
+        """Return when the budget runs out at today's average rate.
+
+        Returns None if it lasts until midnight.
+        """
+        now = dt_util.as_local(now)
+        if self.remaining <= 0:
+            return now
+
+        elapsed = (now - dt_util.start_of_local_day(now)).total_seconds()
+        if self.used == 0 or elapsed <= 0:
+            return None
+
+        exhaustion = now + timedelta(seconds=self.remaining * elapsed / self.used)
+        if exhaustion >= self._midnight(now):
+            return None
+        return exhaustion
+
+    def diagnostics(self, now: datetime) -> dict:
+        """Return the quota state."""
+        return {
+            "daily_quota": self.daily_quota,
+            "used": self.used,
+            "remaining": self.remaining,
+            "budget_rate": self.budget_rate(now),
+            "projected_exhaustion": self.projected_exhaustion(now),
+            "requests_per_refresh": self.requests_per_refresh,
+            "total_weight": self._tracker.total_weight(self.key),
+        }
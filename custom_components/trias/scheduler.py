@@ -0,0 +1,151 @@
+"""Refresh scheduling for Trias stops and trips."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta
+import heapq
+from itertools import count
+import random
+
+from homeassistant.core import HomeAssistant, callback
+
+# Departures closer than this are polled at the minimum interval, for
+# realtime updates until they leave
+IMMINENT_WINDOW = timedelta(minutes=5)
+
+# Wait this long after a departure before refreshing, a bit longer than the
+# tolerance the coordinator uses to drop trips in the past
+DEPARTURE_GRACE = timedelta(seconds=45)
+
+# Share of the time until the next departure to wait before the next refresh
+DEPARTURE_FRACTION = 3
+
+
+class AdaptiveInterval:
+    """Pick refresh intervals from events of the next departure.
+
+    A realtime delay change above the threshold is followed up at the minimum
+    interval. An imminent departure is polled at the minimum interval, and
+    refreshed right after it has left if that comes first, so the next one
+    takes its place. Otherwise the interval is a fraction of the time left
+    until the departure. Intervals are kept within the configured bounds,
+    except for the refresh after a departure.
+    """
+
+    def __init__(self, min_interval: timedelta, max_interval: timedelta) -> None:
+        """Initialize the interval bounds."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def next_interval(
+        self,
+        next_departure: datetime | None,
+        now: datetime,
+        delay_changed: bool = False,
+    ) -> timedelta:
+        """Return the time to wait until the next refresh."""
+        if next_departure is None:
+            return self.max_interval
+
+        if delay_changed:
+            return self.min_interval
+
+        until_departure = next_departure - now
+        if until_departure <= IMMINENT_WINDOW:
+            after_departure = until_departure + DEPARTURE_GRACE
+            if after_departure > timedelta(0):
+                return min(self.min_interval, after_departure)
+            return self.min_interval
+
+        return self._clamp(until_departure / DEPARTURE_FRACTION)
+
+
+class RefreshScheduler:
+    """Call back for each key at its own due time, using a single timer.
+
+    Due times are kept in a heap. Rescheduling a key pushes a new entry and
+    leaves the old one in the heap, outdated entries are skipped when they
+    reach the top.
+    """
+
+    def __init__(self, hass: HomeAssistant, action: Callable[[Hashable], None]) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._action = action
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._due: dict[Hashable, float] = {}
+        self._counter = count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_due: float | None = None
+        self._shut_down = False
+
+    def schedule(self, key: Hashable, delay: timedelta, jitter: float = 0) -> None:
+        """Run the action for key after delay plus up to jitter seconds.
+
+        Ignored once the scheduler has been shut down.
+        """
+        if self._shut_down:
+            return
+
+        due = (
+            self._hass.loop.time()
+            + delay.total_seconds()
+            + (random.uniform(0, jitter) if jitter else 0)
+        )
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._counter), key))
+        self._arm()
+
+    def _pop_outdated(self) -> None:
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _arm(self) -> None:
+        self._pop_outdated()
+        if not self._heap:
+            self._cancel_timer()
+            return
+
+        due = self._heap[0][0]
+        if self._timer is not None and self._timer_due == due:
+            return
+
+        self._cancel_timer()
+        self._timer_due = due
+        self._timer = self._hass.loop.call_at(due, self._fire)
+
+    def _fire(self) -> None:
+        # Everything up to the due time of this timer is due, even if the
+        # loop clock reads slightly earlier.
+        now = max(self._hass.loop.time(), self._timer_due or 0)
+        self._timer = None
+        self._timer_due = None
+
+        while True:
+            self._pop_outdated()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            del self._due[key]
+            self._action(key)
+
+        self._arm()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_due = None
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel all scheduled runs and stop accepting new ones."""
+        self._shut_down = True
+        self._cancel_timer()
+        self._heap.clear()
+        self._due.clear()
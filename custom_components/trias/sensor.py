@@ -2,14 +2,24 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from datetime import datetime
 import logging
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
+from .coordinator import QUOTA, STOP, TRIP
 from .entity import TriasCoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
@@ -32,6 +42,7 @@ async def async_setup_entry(
             coordinator,
         )
         entities.append(sensor)
+        entities.append(StopCountdownSensor(stop, coordinator))
         _LOGGER.debug("Added sensors '%s'", stop["name"])
 
     for id, trip in trips.items():
@@ -40,8 +51,13 @@ async def async_setup_entry(
             coordinator,
         )
         entities.append(sensor)
+        entities.append(TripCountdownSensor(trip, coordinator))
         _LOGGER.debug("Added sensors '%s'", trip["name"])
 
+    if coordinator.quota is not None:
+        entities.append(QuotaRemainingSensor(coordinator, entry))
+        entities.append(QuotaExhaustionSensor(coordinator, entry))
+
     async_add_entities(entities)
 
 
@@ -53,7 +69,7 @@ class StopSensor(TriasCoordinatorEntity, SensorEntity):
 
     def __init__(self, stop, coordinator):
         """Initialize the sensor."""
-        super().__init__(coordinator, stop)
+        super().__init__(coordinator, stop, (STOP, stop["id"]))
         self.coordinator = coordinator
 
         self._stop_id = stop["id"]
@@ -80,7 +96,7 @@ class TripSensor(TriasCoordinatorEntity, SensorEntity):
 
     def __init__(self, trip, coordinator):
         """Initialize the sensor."""
-        super().__init__(coordinator, trip)
+        super().__init__(coordinator, trip, (TRIP, trip["id"]))
         self.coordinator = coordinator
 
         self._trip_id = trip["id"]
@@ -97,3 +113,130 @@ class TripSensor(TriasCoordinatorEntity, SensorEntity):
         self._attr_extra_state_attributes.update(trip["attrs"])
 
         return trip["data"].get("start", None)
+
+
+class CountdownSensor(TriasCoordinatorEntity, SensorEntity):
+    """Minutes until the next cached departure of a stop or trip.
+
+    The countdown is recalculated locally on a short timer. When the first
+    cached departure has left, the next one in the list is used, so the
+    sensor keeps ticking between API updates. State is only written when
+    the minutes or the departure change.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(self, item, coordinator, context, get_item: Callable[[], dict]):
+        """Initialize the sensor."""
+        super().__init__(coordinator, item, context)
+        self._attr_name = f"{self._attr_name} countdown"
+        self._attr_unique_id = f"{item['id']}_countdown"
+        self._get_item = get_item
+        self._written: tuple[int | None, dict | None] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Start the countdown timer."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_tick, self.coordinator.countdown_interval
+            )
+        )
+
+    @callback
+    def _async_tick(self, now: datetime) -> None:
+        if self._countdown() != self._written:
+            self.async_write_ha_state()
+
+    def _countdown(self) -> tuple[int | None, dict | None]:
+        """Return the minutes until the next departure and the departure."""
+        now = dt_util.utcnow()
+
+        for departure in self._get_item()["attrs"].get("departures", []):
+            start = departure["StartTime"]
+            if start is None or start < now:
+                continue
+
+            return int((start - now).total_seconds()) // 60, {
+                "departure": start,
+                "LineName": departure.get("LineName"),
+                "DestinationText": departure.get("DestinationText"),
+            }
+
+        return None, None
+
+    @property
+    def native_value(self):
+        """Return the minutes until the next departure."""
+        self._written = minutes, attributes = self._countdown()
+
+        if attributes is None:
+            for attr in ("departure", "LineName", "DestinationText"):
+                self._attr_extra_state_attributes.pop(attr, None)
+        else:
+            self._attr_extra_state_attributes.update(attributes)
+        return minutes
+
+
+class StopCountdownSensor(CountdownSensor):
+    """Counts down to the next departure at a stop."""
+
+    def __init__(self, stop, coordinator):
+        """Initialize the sensor."""
+        stop_id = stop["id"]
+        super().__init__(
+            stop, coordinator, (STOP, stop_id), lambda: coordinator.stops[stop_id]
+        )
+
+
+class TripCountdownSensor(CountdownSensor):
+    """Counts down to the start of the next trip."""
+
+    def __init__(self, trip, coordinator):
+        """Initialize the sensor."""
+        trip_id = trip["id"]
+        super().__init__(
+            trip, coordinator, (TRIP, trip_id), lambda: coordinator.trips[trip_id]
+        )
+
+
+class QuotaRemainingSensor(TriasCoordinatorEntity, SensorEntity):
+    """Requests left of the daily quota."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:counter"
+
+    def __init__(self, coordinator, entry):
+        """Initialize the sensor."""
+        super().__init__(coordinator, {"name": "API quota remaining"}, QUOTA)
+        self._attr_unique_id = f"{entry.entry_id}_quota_remaining"
+
+    @property
+    def native_value(self):
+        """Return the remaining requests."""
+        quota = self.coordinator.quota
+        self._attr_extra_state_attributes.update(
+            {"daily_quota": quota.daily_quota, "used": quota.used}
+        )
+        return quota.remaining
+
+
+class QuotaExhaustionSensor(TriasCoordinatorEntity, SensorEntity):
+    """Time the daily quota runs out at today's request rate."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:timer-sand"
+
+    def __init__(self, coordinator, entry):
+        """Initialize the sensor."""
+        super().__init__(coordinator, {"name": "API quota exhaustion"}, QUOTA)
+        self._attr_unique_id = f"{entry.entry_id}_quota_exhaustion"
+
+    @property
+    def native_value(self):
+        """Return the projected exhaustion, None if the quota lasts the day."""
+        return self.coordinator.quota.projected_exhaustion(dt_util.utcnow())
@@ -0,0 +1,90 @@
+"""Persistent cache for Trias station data."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.stations"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10  # Seconds
+
+DATA_STATION_CACHE = f"{DOMAIN}_station_cache"
+
+
+class StationCache:
+    """Cache LocationInformation results across restarts.
+
+    Entries are keyed by endpoint url and location id. Entries older than
+    the ttl are still returned, flagged as stale, so callers can use them
+    right away and revalidate in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._stations: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the cache from disk."""
+        data = await self._store.async_load()
+        if data:
+            self._stations = data.get("stations", {})
+
+    @staticmethod
+    def _key(url: str, location_id: str) -> str:
+        return f"{url}|{location_id}"
+
+    def get(
+        self, url: str, location_id: str, ttl: float
+    ) -> tuple[dict[str, Any], bool] | None:
+        """Return (station_data, is_fresh) or None if the station is unknown."""
+        entry = self._stations.get(self._key(url, location_id))
+        if entry is None:
+            return None
+        return entry["data"], time.time() - entry["fetched"] < ttl
+
+    def set(self, url: str, location_id: str, station_data: dict[str, Any]) -> None:
+        """Store station data."""
+        self._stations[self._key(url, location_id)] = {
+            "fetched": time.time(),
+            "data": station_data,
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_invalidate(self, url: str | None = None) -> int:
+        """Drop all entries, or only those of one endpoint. Return the count."""
+        if url is None:
+            keys = list(self._stations)
+        else:
+            keys = [key for key in self._stations if key.startswith(f"{url}|")]
+
+        for key in keys:
+            del self._stations[key]
+
+        await self._store.async_save(self._data_to_save())
+        _LOGGER.debug("Removed %s cached stations", len(keys))
+        return len(keys)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"stations": self._stations}
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+
+@singleton(DATA_STATION_CACHE)
+async def async_get_station_cache(hass: HomeAssistant) -> StationCache:
+    """Return the station cache shared by all config entries."""
+    cache = StationCache(hass)
+    await cache.async_load()
+    return cache
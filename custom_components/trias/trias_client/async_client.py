@@ -1,16 +1,38 @@
 """Async client for Trias API."""
 
-from enum import StrEnum
+from collections.abc import Callable
 
 import aiohttp
 import async_timeout
-import xmltodict
 import asyncio
 import logging
-from datetime import datetime
-from . import exceptions
+import time
+from datetime import datetime, tzinfo
+from . import builder, exceptions, timeparse
+from .coalesce import REQUESTS
+from .endpoints import AuthMethod, Endpoint, select_endpoint
+from .models import Departure, LazyLegs, Leg, Trip
+from .offload import DEFAULT_OFFLOAD_THRESHOLD, DEFAULT_PARSE_WORKERS, ParseExecutor
+from .parser import BACKEND_AUTO, get_backend, parse_response
+from .profiles import DEFAULT_PROFILE, get_profile
+from .timezones import get_time_zone
+from .ratelimit import (
+    DEFAULT_MAX_CONCURRENT,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    PRIORITY_NORMAL,
+)
+from .resilience import (
+    DEFAULT_ATTEMPT_TIMEOUT,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_FAILURE_THRESHOLD,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RECOVERY_TIMEOUT,
+    DEFAULT_REQUEST_DEADLINE,
+    backoff_delay,
+    parse_retry_after,
+)
 from .utils import (
-    convert_to_zulu_format,
     convert_to_local_format,
     to_datetime,
     get_timedelta,
@@ -19,14 +41,15 @@ from .utils import (
 
 _LOGGER = logging.getLogger(__name__)
 
-
-class AuthMethod(StrEnum):
-    REQUEST = "request"
-    BEARER = "bearer"
+HEDGE_MIN_DELAY = 0.1  # Seconds
 
 
 class AsyncTriasClient:
-    """Async client for Trias API."""
+    """Async client for Trias API.
+
+    Requests go to the healthiest of the primary url and the fallback urls,
+    and fail over to the next one when an endpoint fails.
+    """
 
     def __init__(
         self,
@@ -34,41 +57,257 @@ class AsyncTriasClient:
         url: str,
         session: aiohttp.ClientSession = None,
         auth_method: AuthMethod = AuthMethod.REQUEST,
+        parser_backend: str = BACKEND_AUTO,
+        parse_workers: int = DEFAULT_PARSE_WORKERS,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_burst: int = DEFAULT_RATE_BURST,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+        hedge_percentile: float = 0,
+        fallback_urls: list[str] | None = None,
+        auth_methods: dict[str, AuthMethod] | None = None,
+        profile: str = DEFAULT_PROFILE,
+        time_zone: str | tzinfo | None = None,
     ):
         self.api_key = api_key
         self.url = url
         self._session = session
-        self._timeout = 30
-        self.auth_method = auth_method
+        self._timeout = DEFAULT_ATTEMPT_TIMEOUT
+        self._deadline = DEFAULT_REQUEST_DEADLINE
+        self.profile = get_profile(profile)
+        # Subtrees the profile asks for are kept by the parser
+        self.parser = get_backend(parser_backend, self.profile.skipped_elements())
+        self.parse_executor = ParseExecutor(parse_workers, offload_threshold)
+        self.max_retries = max_retries
+        # Local times in requests are interpreted in the endpoint's zone
+        self.time_zone = get_time_zone(time_zone)
+
+        auth_methods = {url: auth_method, **(auth_methods or {})}
+        self.endpoints = [
+            Endpoint(
+                endpoint_url,
+                api_key,
+                AuthMethod(auth_methods.get(endpoint_url, AuthMethod.REQUEST)),
+                rate_limit,
+                rate_burst,
+                max_concurrent,
+                failure_threshold,
+                recovery_timeout,
+            )
+            # dict.fromkeys drops duplicates and keeps the order
+            for endpoint_url in dict.fromkeys([url, *(fallback_urls or [])])
+        ]
+
+        # Send a second request once the first is slower than this
+        # percentile of recent latencies, 0 disables hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedged = 0
+        self.hedge_wins = 0
+        # Called for every HTTP request sent, e.g. to account for quotas
+        self.on_request: Callable[[], None] | None = None
+
+    @property
+    def auth_method(self) -> AuthMethod:
+        """Return the auth method of the primary endpoint."""
+        return self.endpoints[0].auth_method
+
+    @property
+    def auth_methods(self) -> dict[str, AuthMethod]:
+        """Return the auth method of every endpoint."""
+        return {endpoint.url: endpoint.auth_method for endpoint in self.endpoints}
 
     async def ensure_session(self):
-        """Ensure we have a session."""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+        """Ensure the primary endpoint has a session."""
+        await self.endpoints[0].ensure_session(self._session)
 
     async def close(self):
-        """Close session."""
+        """Close session, shared sessions are only released."""
+        self.parse_executor.shutdown()
+        for endpoint in self.endpoints:
+            await endpoint.release_session()
         if self._session and not self._session.closed:
             await self._session.close()
 
-    async def _make_request(self, payload: str):
-        """Make async XML request to Trias API."""
-        await self.ensure_session()
-
-        header = """<?xml version="1.0" encoding="UTF-8"?>
-<Trias version="1.1" xmlns="http://www.vdv.de/trias" xmlns:siri="http://www.siri.org.uk/siri" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
-    <ServiceRequest>
-        <siri:RequestTimestamp>NOW__</siri:RequestTimestamp>
-        <siri:RequestorRef>API_KEY__</siri:RequestorRef>
-        <RequestPayload>
-            PAYLOAD__
-        </RequestPayload>
-    </ServiceRequest>
-</Trias>"""
-
-        header = header.replace("API_KEY__", self.api_key)
-        xml = header.replace("PAYLOAD__", payload)
-        xml = xml.replace("NOW__", convert_to_zulu_format())
+    def diagnostics(self) -> dict:
+        """Return client state for diagnostics."""
+        return {
+            "parser_backend": self.parser.name,
+            "parse_executor": self.parse_executor.diagnostics(),
+            "coalescing": REQUESTS.diagnostics(),
+            "time_parsing": timeparse.cache_info(),
+            "hedging": {
+                "percentile": self.hedge_percentile,
+                "hedged": self.hedged,
+                "wins": self.hedge_wins,
+            },
+            "endpoints": {
+                endpoint.url: endpoint.diagnostics() for endpoint in self.endpoints
+            },
+        }
+
+    def _count_request(self) -> None:
+        if self.on_request is not None:
+            self.on_request()
+
+    def _parse(self, body: bytes, convert=None):
+        """Parse a response body and optionally convert the payload."""
+        trias_payload = parse_response(body, self.parser)
+        if convert is None:
+            return trias_payload
+        return convert(trias_payload)
+
+    async def _make_request(
+        self, payload: bytes, convert=None, priority: int = PRIORITY_NORMAL
+    ):
+        """Make async XML request to Trias API.
+
+        Concurrent identical requests to the same endpoint, also from other
+        clients, share one HTTP request and one parsed result. Requests wait
+        for the rate limiter of the endpoint and api key in priority order.
+        """
+        key = (
+            self.url,
+            self.api_key,
+            getattr(convert, "__qualname__", None),
+            payload,
+        )
+        return await REQUESTS.run(key, self._request, payload, convert, priority)
+
+    async def _request(self, payload: bytes, convert=None, priority=PRIORITY_NORMAL):
+        """Send a request and parse the response.
+
+        Each attempt goes to the healthiest endpoint not tried yet for this
+        request, failing over to the other endpoints is not counted as a
+        retry. Once every endpoint failed or is unavailable, retryable errors
+        are retried with jittered exponential backoff, or after the delay the
+        endpoint asked for with Retry-After. The circuit breaker of an
+        endpoint rejects requests while it is considered down. All attempts
+        share one deadline, each one times out when the deadline has passed.
+
+        The response is parsed, and passed through convert if given, in the
+        parse stage so that large payloads do not block the event loop.
+        """
+        attempt = 0
+        tried: set[Endpoint] = set()
+        error: exceptions.RetryableError | None = None
+        deadline = time.monotonic() + self._deadline
+        while True:
+            untried = [endpoint for endpoint in self.endpoints if endpoint not in tried]
+            endpoint = None
+            if untried:
+                try:
+                    endpoint = select_endpoint(untried)
+                except exceptions.CircuitOpen:
+                    if not tried:
+                        raise
+
+            if endpoint is None:
+                if attempt >= self.max_retries:
+                    raise error
+                attempt += 1
+                tried.clear()
+
+                delay = (
+                    error.retry_after
+                    if error.retry_after is not None
+                    else backoff_delay(attempt - 1)
+                )
+                if delay > DEFAULT_BACKOFF_MAX or time.monotonic() + delay >= deadline:
+                    raise error
+                _LOGGER.debug("Retrying request in %.1fs: %r", delay, error)
+                await asyncio.sleep(delay)
+                continue
+
+            try:
+                response_body = await self._send_hedged(
+                    payload, priority, endpoint, deadline
+                )
+            except exceptions.RetryableError as err:
+                endpoint.record_failure(err.retry_after)
+                if time.monotonic() >= deadline:
+                    raise
+                tried.add(endpoint)
+                error = err
+                _LOGGER.debug("Request to %s failed: %r", endpoint.url, err)
+            except (
+                exceptions.HttpError,
+                exceptions.InvalidRequest,
+                exceptions.InvalidApiKey,
+            ):
+                # The endpoint is up, but refused the request
+                endpoint.record_success()
+                raise
+            else:
+                endpoint.record_success()
+                break
+
+        return await self.parse_executor.run(response_body, self._parse, convert)
+
+    async def _send_hedged(
+        self, payload: bytes, priority: int, endpoint: Endpoint, deadline: float
+    ) -> bytes:
+        """Send a request, and a second one if the first is slow.
+
+        When hedging is enabled and the first request takes longer than the
+        configured latency percentile, an identical request is sent. The
+        first successful response wins and the other request is cancelled.
+        Hedging is skipped while requests are queued by the rate limiter.
+        """
+        hedge_after = (
+            endpoint.latency.percentile(self.hedge_percentile)
+            if self.hedge_percentile
+            else None
+        )
+        if hedge_after is None or endpoint.rate_limiter.queue_depth:
+            return await self._send(payload, priority, endpoint, deadline)
+
+        first = asyncio.ensure_future(self._send(payload, priority, endpoint, deadline))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(
+                tasks, timeout=max(HEDGE_MIN_DELAY, hedge_after)
+            )
+            if first in done:
+                return first.result()
+
+            _LOGGER.debug("Request slower than %.2fs, sending a hedge", hedge_after)
+            self.hedged += 1
+            tasks.add(
+                asyncio.ensure_future(self._send(payload, priority, endpoint, deadline))
+            )
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send(
+        self, payload: bytes, priority: int, endpoint: Endpoint, deadline: float
+    ) -> bytes:
+        """Send a request to an endpoint once and return the response body.
+
+        The request times out after the attempt timeout, or at the deadline
+        (in monotonic time) if that is earlier. A request whose deadline
+        passed while it waited for the rate limiter is not sent. Neither that
+        nor a timeout cut short by the deadline counts against the endpoint.
+        """
+        session = await endpoint.ensure_session(self._session)
+
+        data = builder.envelope(payload, self.api_key)
 
         headers = {
             "Content-Type": "text/xml",
@@ -77,175 +316,124 @@ class AsyncTriasClient:
 
         # If we know already that Bearer auth works, use it right away.
         # Otherwise, we'll try the standard method first and fall back to Bearer if we get HTTP 401.
-        if self.auth_method == AuthMethod.BEARER:
+        if endpoint.auth_method == AuthMethod.BEARER:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
+        timeout = self._timeout
         try:
-            async with async_timeout.timeout(self._timeout):
-                async with self._session.post(
-                    self.url, data=xml.encode("utf-8"), headers=headers
-                ) as response:
-                    response_text = ""
-
-                    # When encountering HTTP 401 and we haven't tried bearer auth yet,
-                    # retry with HTTP Bearer authentication
-                    if (
-                        response.status == 401
-                        and not self.auth_method == AuthMethod.BEARER
-                    ):
-                        _LOGGER.warning(
-                            "Received HTTP 401 (Unauthorized). Retrying with Bearer token authentication."
-                        )
-                        headers["Authorization"] = f"Bearer {self.api_key}"
-                        async with self._session.post(
-                            self.url, data=xml.encode("utf-8"), headers=headers
-                        ) as auth_response:
-                            if auth_response.status == 200:
-                                # Bearer auth succeeded, save this for future requests
-                                response_text = await auth_response.text()
-                                self.auth_method = AuthMethod.BEARER
-                            else:
-                                raise exceptions.HttpError(
-                                    auth_response.status, await auth_response.text()
-                                )
-                    elif response.status == 400:
-                        raise exceptions.InvalidRequest
-                    elif response.status == 403:
-                        raise exceptions.InvalidApiKey
-                    elif response.status != 200:
-                        raise exceptions.HttpError(
-                            response.status, await response.text()
-                        )
-                    else:
-                        response_text = await response.text()
-
-                    # Parse response
-                    response_dict = xmltodict.parse(response_text)
-
-                    if next(iter(response_dict)) == "trias:Trias":
-                        response_text = response_text.replace("trias:", "")
-                        response_dict = xmltodict.parse(response_text)
-
-                    try:
-                        trias_payload = response_dict["Trias"]["ServiceDelivery"][
-                            "DeliveryPayload"
-                        ]
-                    except KeyError:
-                        raise exceptions.ApiError("Invalid response structure")
-
-                    # Check for errors
-                    response_keys = [
-                        "StopEventResponse",
-                        "TripResponse",
-                        "TripInfoResponse",
-                        "LocationInformationResponse",
-                    ]
-
-                    for key in response_keys:
-                        trias_data = trias_payload.get(key, {})
-                        error_message = (
-                            trias_data.get("ErrorMessage", {})
-                            .get("Text", {})
-                            .get("Text")
-                        )
-                        if error_message:
-                            raise exceptions.ApiError(error_message)
-
-                    return trias_payload
+            if deadline <= time.monotonic():
+                raise exceptions.DeadlineExceeded("Request deadline passed")
+            async with endpoint.rate_limiter.limit(priority):
+                started = time.monotonic()
+                if deadline <= started:
+                    raise exceptions.DeadlineExceeded(
+                        "Request deadline passed while queued"
+                    )
+                self._count_request()
+                timeout = min(self._timeout, deadline - started)
+                async with async_timeout.timeout(timeout):
+                    async with session.post(
+                        endpoint.url, data=data, headers=headers
+                    ) as response:
+                        # When encountering HTTP 401 and we haven't tried bearer auth yet,
+                        # retry with HTTP Bearer authentication
+                        if (
+                            response.status == 401
+                            and not endpoint.auth_method == AuthMethod.BEARER
+                        ):
+                            _LOGGER.warning(
+                                "Received HTTP 401 (Unauthorized). Retrying with Bearer token authentication."
+                            )
+                            headers["Authorization"] = f"Bearer {self.api_key}"
+                            self._count_request()
+                            async with session.post(
+                                endpoint.url,
+                                data=data,
+                                headers=headers,
+                            ) as auth_response:
+                                if auth_response.status == 200:
+                                    # Bearer auth succeeded, save this for future requests
+                                    response_body = await auth_response.read()
+                                    endpoint.auth_method = AuthMethod.BEARER
+                                else:
+                                    raise exceptions.HttpError(
+                                        auth_response.status, await auth_response.text()
+                                    )
+                        elif response.status == 400:
+                            raise exceptions.InvalidRequest
+                        elif response.status == 403:
+                            raise exceptions.InvalidApiKey
+                        elif response.status == 429 or response.status >= 500:
+                            raise exceptions.TransientHttpError(
+                                response.status,
+                                await response.text(),
+                                parse_retry_after(response.headers.get("Retry-After")),
+                            )
+                        elif response.status != 200:
+                            raise exceptions.HttpError(
+                                response.status, await response.text()
+                            )
+                        else:
+                            response_body = await response.read()
 
         except asyncio.TimeoutError:
-            raise exceptions.ApiError("Request timeout")
+            if timeout < self._timeout:
+                # Cut short by the deadline, not a slow endpoint
+                raise exceptions.DeadlineExceeded("Request deadline passed")
+            raise exceptions.RequestTimeout("Request timeout")
         except aiohttp.ClientError as e:
-            raise exceptions.ApiError(f"HTTP error: {e}")
+            raise exceptions.ConnectionFailed(f"HTTP error: {e}")
 
-    def _build_stop_event_request(
-        self, location_id: str, number_results: int = 1, dt=None
-    ):
-        """Build XML for stop event request."""
-        xml = """
-<StopEventRequest>
-    <Location>
-        <LocationRef>
-            <StopPointRef>LOCATION_NAME__</StopPointRef>
-        </LocationRef>
-        DepArrTime__
-    </Location>
-    <Params>
-        <NumberOfResults>NumberOfResults__</NumberOfResults>
-        <StopEventType>departure</StopEventType>
-        <IncludePreviousCalls>false</IncludePreviousCalls>
-        <IncludeOnwardCalls>false</IncludeOnwardCalls>
-        <IncludeRealtimeData>true</IncludeRealtimeData>
-    </Params>
-</StopEventRequest>
-"""
-        xml = xml.replace("LOCATION_NAME__", location_id)
-
-        if dt is None:
-            xml = xml.replace("DepArrTime__", "")
-        else:
-            xml = xml.replace(
-                "DepArrTime__",
-                f"<DepArrTime>{convert_to_local_format(dt)}</DepArrTime>",
-            )
+        endpoint.latency.record(time.monotonic() - started)
+        return response_body
 
-        xml = xml.replace("NumberOfResults__", str(number_results))
-        return xml
+    def _dep_arr_time(self, dt) -> str | None:
+        """Return a request time as local time of the endpoint."""
+        return None if dt is None else convert_to_local_format(dt, self.time_zone)
+
+    def _build_stop_event_request(
+        self,
+        location_id: str,
+        number_results: int = 1,
+        dt=None,
+        modes: list[str] | None = None,
+        line_refs: list[str] | None = None,
+    ) -> bytes:
+        """Build XML for stop event request.
+
+        Modes and line references restrict the returned stop events, so
+        fewer results are needed to find the relevant departures.
+        """
+        return builder.stop_event_request(
+            location_id,
+            number_results,
+            self._dep_arr_time(dt),
+            include_previous_calls=self.profile.previous_calls,
+            include_onward_calls=self.profile.onward_calls,
+            include_realtime_data=self.profile.realtime,
+            modes=modes or (),
+            line_refs=line_refs or (),
+        )
 
     def _build_trip_request(
         self, origin_id: str, destination_id: str, number_results: int = 1, dt=None
-    ):
+    ) -> bytes:
         """Build XML for trip request."""
-        xml = """
-<TripRequest>
-    <Origin>
-        <LocationRef>
-            <StopPointRef>LOCATION_NAME_ORIGIN__</StopPointRef>
-        </LocationRef>
-        DepArrTime__
-    </Origin>
-    <Destination>
-        <LocationRef>
-            <StopPointRef>LOCATION_NAME_DESTINATION__</StopPointRef>
-        </LocationRef>
-    </Destination>
-    <Params>
-        <NumberOfResults>NumberOfResults__</NumberOfResults>
-        <IncludeTrackSections>false</IncludeTrackSections>
-        <IncludeLegProjection>true</IncludeLegProjection>
-        <IncludeIntermediateStops>false</IncludeIntermediateStops>
-    </Params>
-</TripRequest>
-"""
-        xml = xml.replace("LOCATION_NAME_ORIGIN__", origin_id)
-        xml = xml.replace("LOCATION_NAME_DESTINATION__", destination_id)
-        xml = xml.replace("NumberOfResults__", str(number_results))
-
-        if dt is None:
-            xml = xml.replace("DepArrTime__", "")
-        else:
-            time = convert_to_local_format(dt)
-            xml = xml.replace("DepArrTime__", f"<DepArrTime>{time}</DepArrTime>")
-
-        return xml
-
-    def _build_location_request(self, location_name: str, number_results: int = 1):
+        return builder.trip_request(
+            origin_id,
+            destination_id,
+            number_results,
+            self._dep_arr_time(dt),
+            include_track_sections=self.profile.track_sections,
+            include_leg_projection=self.profile.leg_projection,
+            include_intermediate_stops=self.profile.intermediate_stops,
+        )
+
+    def _build_location_request(
+        self, location_name: str, number_results: int = 1
+    ) -> bytes:
         """Build XML for location request."""
-        xml = """
-<LocationInformationRequest>
-    <InitialInput>
-        <LocationName>LocationName__</LocationName>
-    </InitialInput>
-    <Restrictions>
-        <Type>stop</Type>
-        <NumberOfResults>NumberOfResults__</NumberOfResults>
-        <IncludePtModes>false</IncludePtModes>
-    </Restrictions>
-</LocationInformationRequest>
-"""
-        xml = xml.replace("LocationName__", location_name)
-        xml = xml.replace("NumberOfResults__", str(number_results))
-        return xml
+        return builder.location_request(location_name, number_results)
 
     # DIESE METHODE FEHLTE - für config_flow.py benötigt
     async def location_information_request(
@@ -286,214 +474,210 @@ class AsyncTriasClient:
 
         return result["LocationInformationResponse"]
 
-    async def async_get_departures(self, location_id: str, number_results: int = 1):
-        """Async get departures with same structure as old get_departures()."""
+    async def async_get_departures(
+        self,
+        location_id: str,
+        number_results: int = 1,
+        dt=None,
+        priority: int = PRIORITY_NORMAL,
+        modes: list[str] | None = None,
+        line_refs: list[str] | None = None,
+    ) -> list[Departure]:
+        """Async get the next departures at a stop."""
         if number_results < 1:
             raise ValueError("Number of results must be 1 or greater")
 
-        payload = self._build_stop_event_request(location_id, number_results)
-        response = await self._make_request(payload)
+        payload = self._build_stop_event_request(
+            location_id, number_results, dt, modes, line_refs
+        )
+        return await self._make_request(payload, self._parse_departures, priority)
 
+    @staticmethod
+    def _parse_departures(response: dict) -> list[Departure]:
+        """Convert a StopEventResponse payload into departures."""
         stop_events = response["StopEventResponse"]["StopEventResult"]
 
         if not isinstance(stop_events, list):
             stop_events = [stop_events]
 
-        xmlresult = []
+        departures = []
 
         for index, stop_event in enumerate(stop_events):
-            data = {}
-            data["id"] = index
-            data["mode"] = stop_event["StopEvent"]["Service"]["Mode"]["PtMode"]
-            data["StopPointName"] = stop_event["StopEvent"]["ThisCall"]["CallAtStop"][
-                "StopPointName"
-            ]["Text"]
-            data["LineName"] = stop_event["StopEvent"]["Service"]["PublishedLineName"][
-                "Text"
-            ]
-            data["DestinationText"] = stop_event["StopEvent"]["Service"][
-                "DestinationText"
-            ]["Text"]
-            data["TimetabledTime"] = to_datetime(
-                stop_event["StopEvent"]["ThisCall"]["CallAtStop"]["ServiceDeparture"][
-                    "TimetabledTime"
-                ]
-            )
-
-            data["EstimatedTime"] = to_datetime(
-                stop_event["StopEvent"]["ThisCall"]["CallAtStop"][
-                    "ServiceDeparture"
-                ].get(
-                    "EstimatedTime",
-                    stop_event["StopEvent"]["ThisCall"]["CallAtStop"][
-                        "ServiceDeparture"
-                    ]["TimetabledTime"],
+            service = stop_event["StopEvent"]["Service"]
+            call = stop_event["StopEvent"]["ThisCall"]["CallAtStop"]
+            service_departure = call["ServiceDeparture"]
+
+            timetabled_time = to_datetime(service_departure["TimetabledTime"])
+            estimated_time = to_datetime(
+                service_departure.get(
+                    "EstimatedTime", service_departure["TimetabledTime"]
                 )
             )
-            data["Delay"] = get_timedelta(data["TimetabledTime"], data["EstimatedTime"])
-
-            if stop_event["StopEvent"]["Service"]["Mode"]["PtMode"] == "rail":
-                data["PlannedBay"] = (
-                    stop_event["StopEvent"]["ThisCall"]["CallAtStop"]
-                    .get("PlannedBay", {})
-                    .get("Text", None)
+            mode = service["Mode"]["PtMode"]
+
+            departures.append(
+                Departure(
+                    id=index,
+                    mode=mode,
+                    stop_point_name=call["StopPointName"]["Text"],
+                    line_name=service["PublishedLineName"]["Text"],
+                    destination_text=service["DestinationText"]["Text"],
+                    timetabled_time=timetabled_time,
+                    estimated_time=estimated_time,
+                    delay=get_timedelta(timetabled_time, estimated_time),
+                    journey_ref=service.get("JourneyRef"),
+                    line_ref=service.get("LineRef"),
+                    planned_bay=(
+                        call.get("PlannedBay", {}).get("Text", None)
+                        if mode == "rail"
+                        else None
+                    ),
                 )
-            elif stop_event["StopEvent"]["Service"]["Mode"]["PtMode"] == "bus":
-                pass
-            xmlresult.append(data)
+            )
 
-        return xmlresult
+        return departures
 
     async def async_get_trip(
-        self, origin_id: str, destination_id: str, number_results: int = 1
-    ):
-        """Async get trip with same structure as old get_trip()."""
+        self,
+        origin_id: str,
+        destination_id: str,
+        number_results: int = 1,
+        dt=None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> list[Trip]:
+        """Async get the next trips between two stops."""
         if number_results < 1:
             raise exceptions.InvalidNumberOfResults
 
-        payload = self._build_trip_request(origin_id, destination_id, number_results)
-        response = await self._make_request(payload)
+        payload = self._build_trip_request(
+            origin_id, destination_id, number_results, dt
+        )
+        return await self._make_request(payload, self._parse_trips, priority)
 
-        trip_data = response["TripResponse"]["TripResult"]
+    @staticmethod
+    def _parse_leg(transportation: dict) -> Leg:
+        """Convert a TripLeg into a leg."""
+        leg_id = int(transportation["LegId"])
 
-        if not isinstance(trip_data, list):
-            trip_data = [trip_data]
+        if "TimedLeg" in transportation:
+            timed_leg = transportation["TimedLeg"]
+            board = timed_leg["LegBoard"]
+            alight = timed_leg["LegAlight"]
 
-        trip_results = []
+            entry_timetabled_time = to_datetime(
+                board["ServiceDeparture"]["TimetabledTime"]
+            )
+            entry_estimated_time = to_datetime(
+                board["ServiceDeparture"].get("EstimatedTime", None)
+            )
+            exit_timetabled_time = to_datetime(
+                alight["ServiceArrival"]["TimetabledTime"]
+            )
+            exit_estimated_time = to_datetime(
+                alight["ServiceArrival"].get("EstimatedTime", None)
+            )
 
-        for index_trip, trip in enumerate(trip_data):
-            trip_result = {
-                "RouteNr": index_trip,
-                "Interchanges": int(trip["Trip"]["Interchanges"]),
-                "Duration": parse_duration(trip["Trip"]["Duration"]),
-                "StartTime": to_datetime(trip["Trip"]["StartTime"]),
-                "EndTime": to_datetime(trip["Trip"]["EndTime"]),
-                "Transportation": [],
-            }
+            return Leg(
+                leg_id=leg_id,
+                pt_mode=timed_leg["Service"]["Mode"]["PtMode"],
+                line_name=timed_leg["Service"]["PublishedLineName"]["Text"],
+                destination_text=timed_leg["Service"]["DestinationText"]["Text"],
+                entry=board["StopPointName"]["Text"],
+                entry_timetabled_time=entry_timetabled_time,
+                entry_estimated_time=entry_estimated_time,
+                entry_current_delay=get_timedelta(
+                    entry_timetabled_time, entry_estimated_time
+                ),
+                exit=alight["StopPointName"]["Text"],
+                exit_timetabled_time=exit_timetabled_time,
+                exit_estimated_time=exit_estimated_time,
+                exit_current_delay=get_timedelta(
+                    exit_timetabled_time, exit_estimated_time
+                ),
+            )
 
-            transport_data = trip["Trip"]["TripLeg"]
+        if "ContinuousLeg" in transportation:
+            continuous_leg = transportation["ContinuousLeg"]
+            return Leg(
+                leg_id=leg_id,
+                pt_mode=continuous_leg["Service"]["IndividualMode"],
+                time_window_start=to_datetime(continuous_leg["TimeWindowStart"]),
+                time_window_end=to_datetime(continuous_leg["TimeWindowEnd"]),
+                duration=parse_duration(continuous_leg["Duration"]),
+            )
 
-            if not isinstance(transport_data, list):
-                transport_data = [transport_data]
+        interchange_leg = transportation["InterchangeLeg"]
+        return Leg(
+            leg_id=leg_id,
+            pt_mode=interchange_leg["InterchangeMode"],
+            entry=interchange_leg["LegStart"]["LocationName"]["Text"],
+            time_window_start=interchange_leg["TimeWindowStart"],
+            exit=interchange_leg["LegEnd"]["LocationName"]["Text"],
+            time_window_end=interchange_leg["TimeWindowEnd"],
+            duration=interchange_leg["Duration"],
+            buffer_time=interchange_leg.get("BufferTime", None),
+        )
+
+    @classmethod
+    def _parse_trips(cls, response: dict) -> list[Trip]:
+        """Convert a TripResponse payload into trips.
+
+        Only the first and last leg are converted up front, for the start
+        and end times of the trip, the others when they are accessed.
+        """
+        trip_data = response["TripResponse"]["TripResult"]
 
-            for transportation in transport_data:
-                leg_data = {
-                    "LegId": int(transportation["LegId"]),
-                }
-
-                if "TimedLeg" in transportation:
-                    timed_leg = transportation["TimedLeg"]
-
-                    leg_data["PTMode"] = timed_leg["Service"]["Mode"]["PtMode"]
-                    leg_data["LineName"] = timed_leg["Service"]["PublishedLineName"][
-                        "Text"
-                    ]
-                    leg_data["DestinationText"] = timed_leg["Service"][
-                        "DestinationText"
-                    ]["Text"]
-
-                    # Entry
-                    leg_data["Entry"] = timed_leg["LegBoard"]["StopPointName"]["Text"]
-                    leg_data["EntryTimetabledTime"] = to_datetime(
-                        timed_leg["LegBoard"]["ServiceDeparture"]["TimetabledTime"]
-                    )
-                    leg_data["EntryEstimatedTime"] = to_datetime(
-                        timed_leg["LegBoard"]["ServiceDeparture"].get(
-                            "EstimatedTime", None
-                        )
-                    )
-                    leg_data["EntryCurrentDelay"] = get_timedelta(
-                        leg_data["EntryTimetabledTime"],
-                        leg_data["EntryEstimatedTime"],
-                    )
+        if not isinstance(trip_data, list):
+            trip_data = [trip_data]
 
-                    # Exit
-                    leg_data["Exit"] = timed_leg["LegAlight"]["StopPointName"]["Text"]
-                    leg_data["ExitTimetabledTime"] = to_datetime(
-                        timed_leg["LegAlight"]["ServiceArrival"]["TimetabledTime"]
-                    )
-                    leg_data["ExitEstimatedTime"] = to_datetime(
-                        timed_leg["LegAlight"]["ServiceArrival"].get(
-                            "EstimatedTime", None
-                        )
-                    )
-                    leg_data["ExitCurrentDelay"] = get_timedelta(
-                        leg_data["ExitTimetabledTime"],
-                        leg_data["ExitEstimatedTime"],
-                    )
+        trips = []
 
-                elif "ContinuousLeg" in transportation:
-                    continuous_leg = transportation["ContinuousLeg"]
-                    leg_data.update(
-                        {
-                            "PTMode": continuous_leg["Service"]["IndividualMode"],
-                            "TimeWindowStart": to_datetime(
-                                continuous_leg["TimeWindowStart"]
-                            ),
-                            "TimeWindowEnd": to_datetime(
-                                continuous_leg["TimeWindowEnd"]
-                            ),
-                            "Duration": parse_duration(continuous_leg["Duration"]),
-                        }
-                    )
+        for index_trip, trip_result in enumerate(trip_data):
+            transport_data = trip_result["Trip"]["TripLeg"]
 
-                else:
-                    interchange_leg = transportation["InterchangeLeg"]
-                    leg_data.update(
-                        {
-                            "PTMode": interchange_leg["InterchangeMode"],
-                            "Entry": interchange_leg["LegStart"]["LocationName"][
-                                "Text"
-                            ],
-                            "TimeWindowStart": interchange_leg["TimeWindowStart"],
-                            "Exit": interchange_leg["LegEnd"]["LocationName"]["Text"],
-                            "TimeWindowEnd": interchange_leg["TimeWindowEnd"],
-                            "Duration": interchange_leg["Duration"],
-                            "BufferTime": interchange_leg.get("BufferTime", None),
-                        }
-                    )
+            if not isinstance(transport_data, list):
+                transport_data = [transport_data]
 
-                trip_result["Transportation"].append(leg_data)
+            trip = Trip(
+                route_nr=index_trip,
+                interchanges=int(trip_result["Trip"]["Interchanges"]),
+                duration=parse_duration(trip_result["Trip"]["Duration"]),
+                start_time=to_datetime(trip_result["Trip"]["StartTime"]),
+                end_time=to_datetime(trip_result["Trip"]["EndTime"]),
+                legs=LazyLegs(transport_data, cls._parse_leg),
+            )
 
-            # Calculate StartTimetabledTime, StartEstimatedTime, etc.
-            if trip_result["Transportation"]:
-                first_leg = trip_result["Transportation"][0]
-                last_leg = trip_result["Transportation"][-1]
+            if trip.legs:
+                first_leg = trip.legs[0]
+                last_leg = trip.legs[-1]
 
-                trip_result["StartTimetabledTime"] = first_leg.get(
-                    "EntryTimetabledTime"
-                )
-                trip_result["StartEstimatedTime"] = first_leg.get("EntryEstimatedTime")
-                trip_result["EndTimetabledTime"] = last_leg.get("ExitTimetabledTime")
-                trip_result["EndEstimatedTime"] = last_leg.get("ExitEstimatedTime")
+                trip.start_timetabled_time = first_leg.entry_timetabled_time
+                trip.start_estimated_time = first_leg.entry_estimated_time
+                trip.end_timetabled_time = last_leg.exit_timetabled_time
+                trip.end_estimated_time = last_leg.exit_estimated_time
 
                 # For backward compatibility with old code
-                trip_result["StartTime"] = (
-                    trip_result["StartEstimatedTime"]
-                    or trip_result["StartTimetabledTime"]
+                trip.start_time = (
+                    trip.start_estimated_time or trip.start_timetabled_time
                 )
-                trip_result["EstimatedStartTime"] = trip_result["StartEstimatedTime"]
 
-                # Calculate delay
-                trip_result["Delay"] = get_timedelta(
-                    trip_result["StartTimetabledTime"],
-                    trip_result["StartEstimatedTime"],
+                trip.delay = get_timedelta(
+                    trip.start_timetabled_time, trip.start_estimated_time
                 )
             else:
-                trip_result["StartTimetabledTime"] = trip_result["StartTime"]
-                trip_result["StartEstimatedTime"] = None
-                trip_result["EndTimetabledTime"] = trip_result["EndTime"]
-                trip_result["EndEstimatedTime"] = None
-                trip_result["Delay"] = None
+                trip.start_timetabled_time = trip.start_time
+                trip.end_timetabled_time = trip.end_time
 
-            trip_results.append(trip_result)
+            trips.append(trip)
 
-        return trip_results
+        return trips
 
-    async def async_get_station_data(self, location_id: str):
+    async def async_get_station_data(
+        self, location_id: str, priority: int = PRIORITY_NORMAL
+    ):
         """Async get station data with same structure as old get_station_data()."""
         payload = self._build_location_request(location_id, 1)
-        response = await self._make_request(payload)
+        response = await self._make_request(payload, priority=priority)
 
         location_data = response["LocationInformationResponse"]["Location"]["Location"]
 
@@ -0,0 +1,183 @@
+"""Build Trias request documents.
+
+Payloads are built from minified templates into UTF-8 bytes. The same
+request always gives the same bytes, so a payload doubles as the key for
+caching and coalescing. The envelope with the timestamp and requestor is
+added per HTTP request. All values are XML escaped.
+"""
+
+from collections.abc import Sequence
+from xml.sax.saxutils import escape
+
+from .profiles import xml_bool
+from .timezones import format_zulu
+
+_ENVELOPE_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Trias version="1.1" xmlns="http://www.vdv.de/trias"'
+    ' xmlns:siri="http://www.siri.org.uk/siri"'
+    ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+    "<ServiceRequest><siri:RequestTimestamp>"
+).encode()
+_ENVELOPE_REQUESTOR = b"</siri:RequestTimestamp><siri:RequestorRef>"
+_ENVELOPE_PAYLOAD = b"</siri:RequestorRef><RequestPayload>"
+_ENVELOPE_END = b"</RequestPayload></ServiceRequest></Trias>"
+
+_STOP_EVENT_REQUEST = (
+    "<StopEventRequest><Location><LocationRef><StopPointRef>%s</StopPointRef>"
+    "</LocationRef>%s</Location><Params>%s<NumberOfResults>%d</NumberOfResults>"
+    "<StopEventType>%s</StopEventType>"
+    "<IncludePreviousCalls>%s</IncludePreviousCalls>"
+    "<IncludeOnwardCalls>%s</IncludeOnwardCalls>"
+    "<IncludeRealtimeData>%s</IncludeRealtimeData></Params></StopEventRequest>"
+)
+
+_TRIP_REQUEST = (
+    "<TripRequest><Origin><LocationRef><StopPointRef>%s</StopPointRef>"
+    "</LocationRef>%s</Origin><Destination><LocationRef>"
+    "<StopPointRef>%s</StopPointRef></LocationRef></Destination><Params>"
+    "<NumberOfResults>%d</NumberOfResults>"
+    "<IncludeTrackSections>%s</IncludeTrackSections>"
+    "<IncludeLegProjection>%s</IncludeLegProjection>"
+    "<IncludeIntermediateStops>%s</IncludeIntermediateStops>"
+    "</Params></TripRequest>"
+)
+
+_TRIP_INFO_REQUEST = (
+    "<TripInfoRequest><JourneyRef>%s</JourneyRef>"
+    "<OperatingDayRef>%s</OperatingDayRef><Params>"
+    "<UseTimetabledDataOnly>%s</UseTimetabledDataOnly>"
+    "<IncludeCalls>%s</IncludeCalls><IncludePosition>%s</IncludePosition>"
+    "<IncludeService>%s</IncludeService></Params></TripInfoRequest>"
+)
+
+_LOCATION_REQUEST = (
+    "<LocationInformationRequest><InitialInput><LocationName>%s</LocationName>"
+    "</InitialInput><Restrictions><Type>stop</Type>"
+    "<NumberOfResults>%d</NumberOfResults>"
+    "<IncludePtModes>%s</IncludePtModes></Restrictions>"
+    "</LocationInformationRequest>"
+)
+
+
+def _dep_arr_time(time: str | None) -> str:
+    return f"<DepArrTime>{escape(time)}</DepArrTime>" if time else ""
+
+
+def envelope(payload: bytes, requestor_ref: str, timestamp: str | None = None) -> bytes:
+    """Wrap a payload into a Trias ServiceRequest document."""
+    return b"".join(
+        (
+            _ENVELOPE_START,
+            escape(timestamp or format_zulu()).encode(),
+            _ENVELOPE_REQUESTOR,
+            escape(requestor_ref).encode(),
+            _ENVELOPE_PAYLOAD,
+            payload,
+            _ENVELOPE_END,
+        )
+    )
+
+
+def stop_event_request(
+    location_id: str,
+    number_results: int = 1,
+    dep_arr_time: str | None = None,
+    stop_event_type: str = "departure",
+    include_previous_calls: bool = False,
+    include_onward_calls: bool = False,
+    include_realtime_data: bool = True,
+    modes: Sequence[str] = (),
+    line_refs: Sequence[str] = (),
+) -> bytes:
+    """Build a StopEventRequest payload.
+
+    Modes and line references restrict the returned stop events. The
+    filters precede NumberOfResults in StopEventParam.
+    """
+    filters = ""
+    if modes:
+        filters += (
+            "<PtModeFilter><Exclude>false</Exclude>"
+            + "".join(f"<PtMode>{escape(mode)}</PtMode>" for mode in modes)
+            + "</PtModeFilter>"
+        )
+    if line_refs:
+        filters += (
+            "<LineFilter>"
+            + "".join(
+                f"<Line><LineRef>{escape(line_ref)}</LineRef></Line>"
+                for line_ref in line_refs
+            )
+            + "<Exclude>false</Exclude></LineFilter>"
+        )
+
+    return (
+        _STOP_EVENT_REQUEST
+        % (
+            escape(location_id),
+            _dep_arr_time(dep_arr_time),
+            filters,
+            number_results,
+            escape(str(stop_event_type).lower()),
+            xml_bool(include_previous_calls),
+            xml_bool(include_onward_calls),
+            xml_bool(include_realtime_data),
+        )
+    ).encode()
+
+
+def trip_request(
+    origin_id: str,
+    destination_id: str,
+    number_results: int = 1,
+    dep_arr_time: str | None = None,
+    include_track_sections: bool = False,
+    include_leg_projection: bool = False,
+    include_intermediate_stops: bool = False,
+) -> bytes:
+    """Build a TripRequest payload."""
+    return (
+        _TRIP_REQUEST
+        % (
+            escape(origin_id),
+            _dep_arr_time(dep_arr_time),
+            escape(destination_id),
+            number_results,
+            xml_bool(include_track_sections),
+            xml_bool(include_leg_projection),
+            xml_bool(include_intermediate_stops),
+        )
+    ).encode()
+
+
+def trip_info_request(
+    journey_ref: str,
+    operating_day_ref: str,
+    use_timetabled_data_only: bool = True,
+    include_calls: bool = True,
+    include_position: bool = False,
+    include_service: bool = True,
+) -> bytes:
+    """Build a TripInfoRequest payload."""
+    return (
+        _TRIP_INFO_REQUEST
+        % (
+            escape(journey_ref),
+            escape(operating_day_ref),
+            xml_bool(use_timetabled_data_only),
+            xml_bool(include_calls),
+            xml_bool(include_position),
+            xml_bool(include_service),
+        )
+    ).encode()
+
+
+def location_request(
+    location_name: str, number_results: int = 1, include_pt_modes: bool = False
+) -> bytes:
+    """Build a LocationInformationRequest payload for stops."""
+    return (
+        _LOCATION_REQUEST
+        % (escape(location_name), number_results, xml_bool(include_pt_modes))
+    ).encode()
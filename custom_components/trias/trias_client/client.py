@@ -3,15 +3,16 @@
 # -*- coding: utf-8 -*-
 # API Dokumentation: https://opentransportdata.swiss/de/cookbook/abfahrts-ankunftsanzeiger/
 
+from datetime import tzinfo
 import logging
 
 import requests
-import xmltodict
 
-from . import exceptions
+from . import builder, exceptions
+from .parser import BACKEND_EXPAT, get_backend, parse_response
+from .profiles import DEFAULT_PROFILE, RequestProfile, get_profile
 from .utils import (
     convert_to_local_format,
-    convert_to_zulu_format,
     get_timedelta,
     parse_duration,
     to_datetime,
@@ -27,6 +28,8 @@ class Client:
         self,
         api_key: str = None,
         url: str = None,
+        time_zone: str | tzinfo | None = None,
+        profile: str = DEFAULT_PROFILE,
     ):
         if api_key is None:
             raise exceptions.InvalidApiKey
@@ -34,25 +37,24 @@ class Client:
             raise exceptions.InvalidUrl
         self.api_key = api_key
         self.url = url
-
-    def get(self, payload):
-        """Call API with trias header"""
-        header = """
-        <?xml version="1.0" encoding="UTF-8"?>
-        <Trias version="1.1" xmlns="http://www.vdv.de/trias" xmlns:siri="http://www.siri.org.uk/siri" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
-            <ServiceRequest>
-                <siri:RequestTimestamp>NOW__</siri:RequestTimestamp>
-                <siri:RequestorRef>API-Explorer</siri:RequestorRef>
-                <RequestPayload>
-                    PAYLOAD__
-                </RequestPayload>
-            </ServiceRequest>
-        </Trias>
+        # Local times in requests are interpreted in the endpoint's zone. A
+        # zone given by name is resolved when first used, requests run in
+        # the executor.
+        self.time_zone = time_zone
+        self.profile = get_profile(profile)
+        self.parser = get_backend(BACKEND_EXPAT, self.profile.skipped_elements())
+
+    def _dep_arr_time(self, dt) -> str | None:
+        """Return a request time as local time of the endpoint."""
+        return None if dt is None else convert_to_local_format(dt, self.time_zone)
+
+    def get(self, payload, profile: RequestProfile | None = None):
+        """Call API with trias header
+
+        The response keeps the subtrees the profile asks for, by default the
+        ones of the client's profile.
         """
-
-        header = header.replace("API-Explorer", self.api_key)
-        xml = header.replace("PAYLOAD__", payload)
-        xml = xml.replace("NOW__", convert_to_zulu_format())
+        xml = builder.envelope(payload, self.api_key)
 
         headers = {
             "Content-Type": "text/xml",
@@ -62,7 +64,7 @@ class Client:
         req = requests.request(
             "post",
             self.url,
-            data=xml.encode("utf-8"),
+            data=xml,
             headers=headers,
             timeout=20,
         )
@@ -79,7 +81,7 @@ class Client:
             auth_req = requests.request(
                 "post",
                 self.url,
-                data=xml.encode("utf-8"),
+                data=xml,
                 headers=headers,
                 timeout=20,
             )
@@ -95,36 +97,12 @@ class Client:
         elif req.status_code != 200:
             raise exceptions.HttpError(req.status_code, req.text)
 
-        response = req.text
-        response_dict = trias_payload = xmltodict.parse(response)
-
-        if next(iter(response_dict)) == "trias:Trias":
-            response = response.replace("trias:", "")
-            response_dict = trias_payload = xmltodict.parse(response)
-
-        try:
-            trias_payload = response_dict["Trias"]["ServiceDelivery"]["DeliveryPayload"]
-        except KeyError:
-            raise exceptions.ApiError(response)
-
-        error = None
-        response_keys = [
-            "StopEventResponse",
-            "TripResponse",
-            "TripInfoResponse",
-            "LocationInformationResponse",
-        ]
-
-        for key in response_keys:
-            trias_data = trias_payload.get(key, {})
-            error_message = (
-                trias_data.get("ErrorMessage", {}).get("Text", {}).get("Text")
-            )
-
-            if error_message:
-                raise exceptions.ApiError(error_message)
-
-        return trias_payload
+        parser = (
+            self.parser
+            if profile is None
+            else get_backend(BACKEND_EXPAT, profile.skipped_elements())
+        )
+        return parse_response(req.content, parser)
 
     def test_connection(self) -> bool:
         """Simple check if API key + URL work"""
@@ -145,40 +123,23 @@ class Client:
         include_realtime_data=True,
     ):
         """Make API call to get stop_event_request"""
-        xml = """
-        <StopEventRequest>
-            <Location>
-                <LocationRef>
-                    <StopPointRef>LOCATION_NAME__</StopPointRef>
-                </LocationRef>
-                DepArrTime__
-            </Location>
-            <Params>
-                <NumberOfResults>NumberOfResults__</NumberOfResults>
-                <StopEventType>StopEventType__</StopEventType>
-                <IncludePreviousCalls>IncludePreviousCalls__</IncludePreviousCalls>
-                <IncludeOnwardCalls>IncludeOnwardCalls__</IncludeOnwardCalls>
-                <IncludeRealtimeData>IncludeRealtimeData__</IncludeRealtimeData>
-            </Params>
-        </StopEventRequest>
-        """
-        xml = xml.replace("LOCATION_NAME__", location_id)
-
-        if dt is None:
-            xml = xml.replace("DepArrTime__", "")
-        else:
-            xml = xml.replace(
-                "DepArrTime__",
-                f"<DepArrTime>{convert_to_local_format(dt)}</DepArrTime>",
-            )
-
-        xml = xml.replace("NumberOfResults__", str(number_of_results))
-        xml = xml.replace("StopEventType__", str(stop_event_type).lower())
-        xml = xml.replace("IncludePreviousCalls__", str(include_previous_calls).lower())
-        xml = xml.replace("IncludeOnwardCalls__", str(include_onward_calls).lower())
-        xml = xml.replace("IncludeRealtimeData__", str(include_realtime_data).lower())
+        xml = builder.stop_event_request(
+            location_id,
+            number_of_results,
+            self._dep_arr_time(dt),
+            stop_event_type,
+            include_previous_calls,
+            include_onward_calls,
+            include_realtime_data,
+        )
+        # Keep the calls asked for in this request
+        profile = self.profile._replace(
+            realtime=include_realtime_data,
+            previous_calls=include_previous_calls,
+            onward_calls=include_onward_calls,
+        )
 
-        return self.get(xml)
+        return self.get(xml, profile)
 
     def trip_request(
         self,
@@ -190,36 +151,15 @@ class Client:
         """Make API call to get trip_request"""
         if number_of_results < 1:
             raise exceptions.InvalidNumberOfResults
-        xml = """
-        <TripRequest>
-            <Origin>
-                <LocationRef>
-                    <StopPointRef>LOCATION_NAME_ORIGIN__</StopPointRef>
-                </LocationRef>
-                DepArrTime__
-            </Origin>
-            <Destination>
-                <LocationRef>
-                    <StopPointRef>LOCATION_NAME_DESTINATION__</StopPointRef>
-                </LocationRef>
-            </Destination>
-            <Params>
-                <NumberOfResults>NumberOfResults__</NumberOfResults>
-                <IncludeTrackSections>false</IncludeTrackSections>
-                <IncludeLegProjection>true</IncludeLegProjection>
-                <IncludeIntermediateStops>false</IncludeIntermediateStops>
-            </Params>
-        </TripRequest>
-        """
-
-        xml = xml.replace("LOCATION_NAME_ORIGIN__", location_id_origin)
-        xml = xml.replace("NumberOfResults__", str(number_of_results))
-        xml = xml.replace("LOCATION_NAME_DESTINATION__", location_id_destination)
-        if dt is None:
-            xml = xml.replace("DepArrTime__", "")
-        else:
-            time = convert_to_local_format(dt)
-            xml = xml.replace("DepArrTime__", f"<DepArrTime>{time}</DepArrTime>")
+        xml = builder.trip_request(
+            location_id_origin,
+            location_id_destination,
+            number_of_results,
+            self._dep_arr_time(dt),
+            include_track_sections=self.profile.track_sections,
+            include_leg_projection=self.profile.leg_projection,
+            include_intermediate_stops=self.profile.intermediate_stops,
+        )
 
         trias_payload = self.get(xml)
         return trias_payload["TripResponse"]
@@ -234,29 +174,20 @@ class Client:
         include_service=True,
     ):
         """Make API call to get trip_info_request"""
-        xml = """
-        <TripInfoRequest>
-            <JourneyRef>JourneyRef__</JourneyRef>
-            <OperatingDayRef>OperatingDayRef__</OperatingDayRef>
-            <Params>
-                <UseTimetabledDataOnly>UseTimetabledDataOnly__</UseTimetabledDataOnly>
-                <IncludeCalls>IncludeCalls__</IncludeCalls>
-                <IncludePosition>IncludePosition__</IncludePosition>
-                <IncludeService>IncludeService__</IncludeService>
-            </Params>
-        </TripInfoRequest>
-        """
-
-        xml = xml.replace("JourneyRef__", journey_ref)
-        xml = xml.replace("OperatingDayRef__", operating_day_ref)
-        xml = xml.replace(
-            "UseTimetabledDataOnly__", str(use_timetabled_data_only).lower()
+        xml = builder.trip_info_request(
+            journey_ref,
+            operating_day_ref,
+            use_timetabled_data_only,
+            include_calls,
+            include_position,
+            include_service,
+        )
+        # The calls of a trip are reported as previous and onward calls
+        profile = self.profile._replace(
+            previous_calls=include_calls, onward_calls=include_calls
         )
-        xml = xml.replace("IncludeCalls__", str(include_calls).lower())
-        xml = xml.replace("IncludePosition__", str(include_position).lower())
-        xml = xml.replace("IncludeService__", str(include_service).lower())
 
-        return self.get(xml)
+        return self.get(xml, profile)
 
     def location_information_request(
         self,
@@ -266,22 +197,9 @@ class Client:
         ignore_low_probability=False,
     ):
         """Make API call to get location_information_request"""
-        xml = """
-        <LocationInformationRequest>
-            <InitialInput>
-                <LocationName>LocationName__</LocationName>
-            </InitialInput>
-            <Restrictions>
-                <Type>stop</Type>
-                <NumberOfResults>NumberOfResults__</NumberOfResults>
-                <IncludePtModes>IncludePtModes__</IncludePtModes>
-            </Restrictions>
-        </LocationInformationRequest>
-        """
-
-        xml = xml.replace("LocationName__", location_name)
-        xml = xml.replace("NumberOfResults__", str(number_of_results))
-        xml = xml.replace("IncludePtModes__", str(include_pt_podes).lower())
+        xml = builder.location_request(
+            location_name, number_of_results, include_pt_podes
+        )
 
         result = self.get(xml)
 
@@ -0,0 +1,74 @@
+"""Single-flight coalescing of identical requests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the call, callers arriving while it is running
+    await the same result. Results are shared objects and must not be
+    mutated by callers. A caller that is cancelled does not cancel the call
+    for the others, the call is cancelled once every caller went away.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._waiters: dict[asyncio.Future, int] = {}
+        self.started = 0
+        self.joined = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of running calls."""
+        return len(self._calls)
+
+    async def run(self, key: Hashable, func: Callable[..., Awaitable], *args):
+        """Run func(*args) unless a call with the same key is running."""
+        future = self._calls.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(func(*args))
+            self._calls[key] = future
+            self.started += 1
+
+            def _done(done: asyncio.Future) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+                self._waiters.pop(done, None)
+                # Mark the exception as retrieved if every caller went away
+                if not done.cancelled():
+                    done.exception()
+
+            future.add_done_callback(_done)
+        else:
+            self.joined += 1
+
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._release(future)
+
+    def _release(self, future: asyncio.Future) -> None:
+        """Drop a waiter and cancel the call when it was the last one."""
+        waiters = self._waiters.get(future, 0) - 1
+        if waiters > 0:
+            self._waiters[future] = waiters
+            return
+
+        self._waiters.pop(future, None)
+        if not future.done():
+            future.cancel()
+
+    def diagnostics(self) -> dict:
+        """Return coalescing counters."""
+        return {
+            "started": self.started,
+            "joined": self.joined,
+            "in_flight": self.in_flight,
+        }
+
+
+REQUESTS = SingleFlight()
@@ -0,0 +1,173 @@
+"""Health tracking and selection of Trias endpoints."""
+
+from collections import deque
+from enum import StrEnum
+import logging
+import time
+
+import aiohttp
+
+from . import exceptions
+from .latency import LatencyTracker
+from .ratelimit import (
+    DEFAULT_MAX_CONCURRENT,
+    DEFAULT_RATE_BURST,
+    DEFAULT_RATE_LIMIT,
+    LIMITERS,
+)
+from .resilience import BREAKERS, DEFAULT_FAILURE_THRESHOLD, DEFAULT_RECOVERY_TIMEOUT
+from .session import SESSIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+# Outcomes older than this no longer count, so a failed endpoint is tried
+# again eventually
+DEFAULT_HEALTH_WINDOW = 300  # Seconds
+
+# Latency assumed for endpoints without enough samples, when no endpoint has
+# any to compare with
+UNKNOWN_LATENCY = 1.0  # Seconds
+
+
+class AuthMethod(StrEnum):
+    REQUEST = "request"
+    BEARER = "bearer"
+
+
+class Endpoint:
+    """One Trias endpoint with its auth method, session and health.
+
+    The outcome of recent requests is kept in a sliding time window. The cost
+    of an endpoint is its median latency divided by its success rate, which
+    is the expected time to get a good response.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        auth_method: AuthMethod = AuthMethod.REQUEST,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_burst: int = DEFAULT_RATE_BURST,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+        window: float = DEFAULT_HEALTH_WINDOW,
+    ) -> None:
+        self.url = url
+        self.auth_method = auth_method
+        self.session: aiohttp.ClientSession | None = None
+        self.shared_session = False
+        self.rate_limiter = LIMITERS.get(
+            url, api_key, rate_limit, rate_burst, max_concurrent
+        )
+        self.circuit_breaker = BREAKERS.get(
+            url, api_key, failure_threshold, recovery_timeout
+        )
+        self.latency = LatencyTracker()
+        self._window = window
+        self._results: deque[tuple[float, bool]] = deque()
+
+    @property
+    def error_rate(self) -> float:
+        """Return the share of failed requests in the window."""
+        self._prune()
+        if not self._results:
+            return 0.0
+        failures = sum(not ok for _, ok in self._results)
+        return failures / len(self._results)
+
+    @property
+    def median_latency(self) -> float | None:
+        """Return the median latency, or None without enough samples."""
+        return self.latency.percentile(50)
+
+    def cost(self, unknown_latency: float = UNKNOWN_LATENCY) -> float:
+        """Return the expected time to get a good response.
+
+        Without enough latency samples, unknown_latency is assumed.
+        """
+        latency = self.median_latency
+        if latency is None:
+            latency = unknown_latency
+        return latency / max(0.05, 1 - self.error_rate)
+
+    def _prune(self) -> None:
+        expired = time.monotonic() - self._window
+        while self._results and self._results[0][0] < expired:
+            self._results.popleft()
+
+    def record_success(self) -> None:
+        """Count a request the endpoint answered."""
+        self._results.append((time.monotonic(), True))
+        self.circuit_breaker.record_success()
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Count a request that failed with a retryable error."""
+        self._results.append((time.monotonic(), False))
+        self.circuit_breaker.record_failure(retry_after)
+
+    async def ensure_session(
+        self, session: aiohttp.ClientSession | None = None
+    ) -> aiohttp.ClientSession:
+        """Return the given session, or one shared by clients of the endpoint."""
+        if session is not None:
+            return session
+
+        if self.session is None or self.session.closed:
+            if self.shared_session:
+                await SESSIONS.release(self.url)
+            self.session = SESSIONS.acquire(self.url)
+            self.shared_session = True
+        return self.session
+
+    async def release_session(self) -> None:
+        """Release the shared session."""
+        if self.shared_session:
+            self.session = None
+            self.shared_session = False
+            await SESSIONS.release(self.url)
+
+    def diagnostics(self) -> dict:
+        """Return the endpoint health."""
+        return {
+            "auth_method": self.auth_method,
+            "error_rate": self.error_rate,
+            "cost": self.cost(),
+            "shared_session": self.shared_session,
+            "latency": self.latency.diagnostics(),
+            "rate_limiter": self.rate_limiter.diagnostics(),
+            "circuit_breaker": self.circuit_breaker.diagnostics(),
+        }
+
+
+def select_endpoint(endpoints: list[Endpoint]) -> Endpoint:
+    """Return the healthiest endpoint whose circuit lets a request through.
+
+    Endpoints are ordered by cost and then by their configured order.
+    Endpoints without latency samples are assumed to be as slow as the
+    slowest measured one, so they never rank ahead of a healthy measured
+    endpoint that comes before them. Raises CircuitOpen if every circuit is
+    open.
+    """
+    measured = [
+        endpoint.median_latency
+        for endpoint in endpoints
+        if endpoint.median_latency is not None
+    ]
+    unknown_latency = max(measured, default=UNKNOWN_LATENCY)
+    ranked = sorted(
+        enumerate(endpoints),
+        key=lambda item: (item[1].cost(unknown_latency), item[0]),
+    )
+
+    error = None
+    for _, endpoint in ranked:
+        try:
+            endpoint.circuit_breaker.before_request()
+        except exceptions.CircuitOpen as err:
+            error = err
+            continue
+        return endpoint
+
+    raise error
@@ -27,3 +27,35 @@ class HttpError(Exception):
         super().__init__(*args)
         self.status_code = status_code
         self.response = response
+
+
+class RetryableError(ApiError):
+    """Error that may go away when the request is repeated."""
+
+    retry_after: float | None = None
+
+
+class RequestTimeout(RetryableError):
+    pass
+
+
+class ConnectionFailed(RetryableError):
+    pass
+
+
+class TransientHttpError(HttpError, RetryableError):
+    """HTTP 429 or 5xx response, optionally with a Retry-After delay."""
+
+    def __init__(
+        self, status_code, response, retry_after: float | None = None, *args: object
+    ) -> None:
+        super().__init__(status_code, response, *args)
+        self.retry_after = retry_after
+
+
+class CircuitOpen(ApiError):
+    """The endpoint failed repeatedly, the request was not sent."""
+
+
+class DeadlineExceeded(ApiError):
+    """The request deadline passed before it was sent, e.g. while queued."""
@@ -0,0 +1,41 @@
+"""Latency tracking of Trias requests."""
+
+from collections import deque
+import math
+
+DEFAULT_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Keep the latencies of the last requests and report percentiles."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a successful request."""
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the latency below which percent of the requests finished.
+
+        Returns None until enough requests have been seen.
+        """
+        if len(self._samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(percent / 100 * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+    def diagnostics(self) -> dict:
+        """Return the sample count and common percentiles."""
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
@@ -0,0 +1,155 @@
+"""Typed records returned by the async client."""
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+
+def delay_attributes(delay: timedelta | None) -> dict:
+    """Return the delay as state attributes."""
+    seconds = int(delay.total_seconds()) if delay is not None else 0
+    return {
+        "Delay": str(delay) if delay else None,
+        "DelaySeconds": seconds,
+        "DelayMinutes": int(seconds / 60),
+    }
+
+
+@dataclass(slots=True)
+class Departure:
+    """A departure at a stop."""
+
+    id: int
+    mode: str
+    stop_point_name: str
+    line_name: str
+    destination_text: str
+    timetabled_time: datetime | None
+    estimated_time: datetime | None
+    delay: timedelta | None = None
+    journey_ref: str | None = None
+    line_ref: str | None = None
+    planned_bay: str | None = None
+
+    @property
+    def departure_time(self) -> datetime | None:
+        """Return the realtime departure time, or the timetabled one."""
+        return self.estimated_time or self.timetabled_time
+
+    def as_attributes(self) -> dict:
+        """Return the departure as state attributes."""
+        return {
+            "Mode": self.mode,
+            "StopPointName": self.stop_point_name,
+            "LineName": self.line_name,
+            "LineRef": self.line_ref,
+            "DestinationText": self.destination_text,
+            "StartTime": self.departure_time,
+            "TimetabledTime": self.timetabled_time,
+            "EstimatedTime": self.estimated_time,
+            "PlannedBay": self.planned_bay,
+            **delay_attributes(self.delay),
+        }
+
+
+@dataclass(slots=True)
+class Leg:
+    """A leg of a trip.
+
+    Timed legs have a line and board and alight times, continuous legs
+    (e.g. walking) and interchange legs a time window instead.
+    """
+
+    leg_id: int
+    pt_mode: str | None
+    line_name: str | None = None
+    destination_text: str | None = None
+    entry: str | None = None
+    entry_timetabled_time: datetime | None = None
+    entry_estimated_time: datetime | None = None
+    entry_current_delay: timedelta | None = None
+    exit: str | None = None
+    exit_timetabled_time: datetime | None = None
+    exit_estimated_time: datetime | None = None
+    exit_current_delay: timedelta | None = None
+    time_window_start: datetime | str | None = None
+    time_window_end: datetime | str | None = None
+    duration: str | None = None
+    buffer_time: str | None = None
+
+
+class LazyLegs(Sequence):
+    """Legs of a trip, converted from the response when first accessed.
+
+    Sensors only read the first leg of each trip, so the others are usually
+    never converted.
+    """
+
+    __slots__ = ("_raw", "_parse", "_legs")
+
+    def __init__(self, raw: list[dict], parse: Callable[[dict], Leg]) -> None:
+        self._raw = raw
+        self._parse = parse
+        self._legs: list[Leg | None] = [None] * len(raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._raw)))]
+
+        leg = self._legs[index]
+        if leg is None:
+            leg = self._legs[index] = self._parse(self._raw[index])
+        return leg
+
+    def __repr__(self) -> str:
+        parsed = sum(leg is not None for leg in self._legs)
+        return f"<LazyLegs {parsed}/{len(self._raw)} parsed>"
+
+
+@dataclass(slots=True)
+class Trip:
+    """A connection between two stops."""
+
+    route_nr: int
+    interchanges: int
+    duration: str
+    start_time: datetime | None
+    end_time: datetime | None
+    legs: Sequence[Leg] = field(default_factory=list)
+    start_timetabled_time: datetime | None = None
+    start_estimated_time: datetime | None = None
+    end_timetabled_time: datetime | None = None
+    end_estimated_time: datetime | None = None
+    delay: timedelta | None = None
+
+    @property
+    def departure_time(self) -> datetime | None:
+        """Return the realtime start time, or the timetabled one."""
+        return self.start_estimated_time or self.start_time
+
+    def as_attributes(self) -> dict:
+        """Return the trip as state attributes."""
+        first_leg = self.legs[0] if self.legs else None
+        attributes = {
+            "StartTime": self.start_time,
+            "TimetabledStartTime": self.start_timetabled_time,
+            "EstimatedStartTime": self.start_estimated_time,
+            "EndTime": self.end_time,
+            "TimetabledEndTime": self.end_timetabled_time,
+            "EstimatedEndTime": self.end_estimated_time,
+            "Interchanges": self.interchanges,
+            "LineName": first_leg.line_name if first_leg else None,
+            "DestinationText": first_leg.destination_text if first_leg else None,
+            "Duration": self.duration,
+            **delay_attributes(self.delay),
+        }
+
+        if self.start_estimated_time and self.start_time:
+            delay = self.start_estimated_time - self.start_time
+            attributes["CurrentDelay"] = str(delay)
+            attributes["CurrentDelayMinutes"] = int(delay.total_seconds() / 60)
+
+        return attributes
@@ -0,0 +1,117 @@
+"""Parse stage that moves large responses off the event loop."""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PARSE_WORKERS = 2
+DEFAULT_OFFLOAD_THRESHOLD = 32 * 1024  # Bytes
+
+
+class ParseExecutor:
+    """Run parse jobs inline or in a bounded thread pool.
+
+    Payloads smaller than the threshold are parsed inline, since handing them
+    to a thread costs more than parsing them. Larger payloads are parsed by at
+    most `max_workers` threads.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_PARSE_WORKERS,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.offload_threshold = max(0, int(offload_threshold))
+        self._executor: ThreadPoolExecutor | None = None
+
+        self.inline_count = 0
+        self.inline_time = 0.0
+        self.inline_max = 0.0
+        self.offloaded_count = 0
+        self.queued_time = 0.0
+        self.queued_max = 0.0
+        self.parse_time = 0.0
+        self.parse_max = 0.0
+
+    async def run(self, body: bytes, func, *args):
+        """Run func(body, *args), offloading it when the body is large."""
+        if len(body) < self.offload_threshold:
+            started = time.perf_counter()
+            try:
+                return func(body, *args)
+            finally:
+                blocked = time.perf_counter() - started
+                self.inline_count += 1
+                self.inline_time += blocked
+                self.inline_max = max(self.inline_max, blocked)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="trias_parse"
+            )
+
+        submitted = time.perf_counter()
+        timings: list[float] = []
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return func(body, *args)
+            finally:
+                timings.append(time.perf_counter() - started)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, job)
+        finally:
+            if timings:
+                self._record_offload(len(body), submitted, timings[0])
+
+    def _record_offload(self, size: int, submitted: float, parsed: float) -> None:
+        queued = max(0.0, time.perf_counter() - submitted - parsed)
+
+        self.offloaded_count += 1
+        self.queued_time += queued
+        self.queued_max = max(self.queued_max, queued)
+        self.parse_time += parsed
+        self.parse_max = max(self.parse_max, parsed)
+
+        _LOGGER.debug(
+            "Parsed %d bytes in worker: queued %.1f ms, parsed %.1f ms",
+            size,
+            queued * 1000,
+            parsed * 1000,
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def diagnostics(self) -> dict:
+        """Return parse timings for diagnostics, times in milliseconds."""
+
+        def _avg(total: float, count: int) -> float:
+            return round(total / count * 1000, 2) if count else 0.0
+
+        return {
+            "max_workers": self.max_workers,
+            "offload_threshold": self.offload_threshold,
+            "inline": {
+                "count": self.inline_count,
+                "avg_blocked_ms": _avg(self.inline_time, self.inline_count),
+                "max_blocked_ms": round(self.inline_max * 1000, 2),
+            },
+            "offloaded": {
+                "count": self.offloaded_count,
+                "avg_queued_ms": _avg(self.queued_time, self.offloaded_count),
+                "max_queued_ms": round(self.queued_max * 1000, 2),
+                "avg_parse_ms": _avg(self.parse_time, self.offloaded_count),
+                "max_parse_ms": round(self.parse_max * 1000, 2),
+            },
+        }
@@ -0,0 +1,293 @@
+"""XML parser backends for Trias responses."""
+
+from abc import ABC, abstractmethod
+import logging
+from xml.parsers import expat
+
+from . import exceptions
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+_LOGGER = logging.getLogger(__name__)
+
+BACKEND_AUTO = "auto"
+BACKEND_EXPAT = "expat"
+BACKEND_LXML = "lxml"
+
+# Expat reports namespaced names as "<uri>}<local name>", so both the default
+# namespace and prefixed documents ("trias:Trias") map to the same local names.
+_NAMESPACE_SEPARATOR = "}"
+
+# Subtrees the client does not read unless the request profile asks for
+# them. They are dropped while parsing instead of being built and thrown
+# away, which matters most for leg projections.
+SKIPPED_ELEMENTS = frozenset(
+    {
+        "Extension",
+        "LegIntermediates",
+        "LegProjection",
+        "LegTrack",
+        "OnwardCall",
+        "PreviousCall",
+        "SituationFullRef",
+        "StopEventResponseContext",
+        "TrackSection",
+        "TripResponseContext",
+    }
+)
+
+RESPONSE_KEYS = (
+    "StopEventResponse",
+    "TripResponse",
+    "TripInfoResponse",
+    "LocationInformationResponse",
+)
+
+
+class _TreeBuilder:
+    """Build an xmltodict compatible tree from expat events.
+
+    Leaf elements become strings (or None when empty), elements with children
+    become dicts and repeated children are collected into lists. Attributes
+    are not used by the Trias payloads and are ignored.
+    """
+
+    __slots__ = ("_skip", "_skip_depth", "_stack")
+
+    def __init__(self, skip: frozenset[str]) -> None:
+        self._skip = skip
+        self._skip_depth = 0
+        # Each frame is [name, children, text parts]
+        self._stack: list[list] = [["", None, []]]
+
+    @property
+    def root(self) -> dict:
+        """Return the parsed document."""
+        return self._stack[0][1] or {}
+
+    def start(self, name: str, attrs) -> None:
+        if self._skip_depth:
+            self._skip_depth += 1
+            return
+
+        name = name.rpartition(_NAMESPACE_SEPARATOR)[2]
+        if name in self._skip:
+            self._skip_depth = 1
+            return
+
+        self._stack.append([name, None, []])
+
+    def end(self, name: str) -> None:
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+
+        name, children, text = self._stack.pop()
+        text = "".join(text).strip() if text else ""
+
+        if children is None:
+            value = text or None
+        else:
+            value = children
+            if text:
+                children["#text"] = text
+
+        parent = self._stack[-1]
+        if parent[1] is None:
+            parent[1] = {}
+        siblings = parent[1]
+
+        if name not in siblings:
+            siblings[name] = value
+        elif isinstance(siblings[name], list):
+            siblings[name].append(value)
+        else:
+            siblings[name] = [siblings[name], value]
+
+    def data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._stack[-1][2].append(data)
+
+
+class ParserBackend(ABC):
+    """Base class for parser backends."""
+
+    name: str = ""
+
+    @abstractmethod
+    def parse(self, body: bytes | str) -> dict:
+        """Parse a document into an xmltodict compatible tree."""
+
+
+class ExpatBackend(ParserBackend):
+    """Pure Python backend, always available."""
+
+    name = BACKEND_EXPAT
+
+    def __init__(self, skip: frozenset[str] = SKIPPED_ELEMENTS) -> None:
+        self._skip = skip
+
+    def parse(self, body: bytes | str) -> dict:
+        builder = _TreeBuilder(self._skip)
+
+        parser = expat.ParserCreate(namespace_separator=_NAMESPACE_SEPARATOR)
+        parser.buffer_text = True
+        parser.StartElementHandler = builder.start
+        parser.EndElementHandler = builder.end
+        parser.CharacterDataHandler = builder.data
+
+        try:
+            parser.Parse(body, True)
+        except expat.ExpatError as err:
+            raise exceptions.ApiError(f"Invalid XML response: {err}") from err
+
+        return builder.root
+
+
+class LxmlBackend(ParserBackend):
+    """libxml2 backend, only the DeliveryPayload is converted.
+
+    The payload is located with a compiled XPath, so the tree walk in Python
+    is limited to the elements the client actually reads.
+    """
+
+    name = BACKEND_LXML
+
+    def __init__(self, skip: frozenset[str] = SKIPPED_ELEMENTS) -> None:
+        if etree is None:
+            raise ImportError("lxml is not installed")
+        self._skip = skip
+        self._payload_xpath = etree.XPath(
+            "/*[local-name()='Trias']"
+            "/*[local-name()='ServiceDelivery']"
+            "/*[local-name()='DeliveryPayload']"
+        )
+
+    def parse(self, body: bytes | str) -> dict:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        # Parser objects must not be shared between threads
+        parser = etree.XMLParser(
+            remove_blank_text=True,
+            remove_comments=True,
+            resolve_entities=False,
+            no_network=True,
+        )
+
+        try:
+            root = etree.fromstring(body, parser)
+        except etree.XMLSyntaxError as err:
+            raise exceptions.ApiError(f"Invalid XML response: {err}") from err
+
+        payloads = self._payload_xpath(root)
+        if not payloads:
+            return {}
+
+        return {
+            "Trias": {
+                "ServiceDelivery": {
+                    "DeliveryPayload": self._to_value(payloads[0]),
+                }
+            }
+        }
+
+    def _to_value(self, element):
+        """Convert an element the same way the expat backend does."""
+        skip = self._skip
+        children = None
+
+        for child in element:
+            tag = child.tag
+            if not isinstance(tag, str):
+                # Processing instructions and entities
+                continue
+            name = tag.rpartition(_NAMESPACE_SEPARATOR)[2]
+            if name in skip:
+                continue
+
+            value = self._to_value(child)
+            if children is None:
+                children = {}
+
+            if name not in children:
+                children[name] = value
+            elif isinstance(children[name], list):
+                children[name].append(value)
+            else:
+                children[name] = [children[name], value]
+
+        text = element.text.strip() if element.text else ""
+
+        if children is None:
+            return text or None
+        if text:
+            children["#text"] = text
+        return children
+
+
+BACKENDS: dict[str, type[ParserBackend]] = {
+    BACKEND_EXPAT: ExpatBackend,
+    BACKEND_LXML: LxmlBackend,
+}
+
+
+def available_backends() -> list[str]:
+    """Return the names of the backends usable in this environment."""
+    return [name for name in BACKENDS if name != BACKEND_LXML or etree is not None]
+
+
+def get_backend(
+    name: str | None = BACKEND_AUTO, skip: frozenset[str] = SKIPPED_ELEMENTS
+) -> ParserBackend:
+    """Return a parser backend, falling back to expat if lxml is missing.
+
+    Subtrees with names in skip are dropped while parsing.
+    """
+    if name in (None, BACKEND_AUTO):
+        name = BACKEND_LXML if etree is not None else BACKEND_EXPAT
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+
+    if name == BACKEND_LXML and etree is None:
+        _LOGGER.warning("lxml is not installed, falling back to the expat parser")
+        name = BACKEND_EXPAT
+
+    return BACKENDS[name](skip)
+
+
+_DEFAULT_BACKEND = ExpatBackend()
+
+
+def parse_xml(body: bytes | str, backend: ParserBackend | None = None) -> dict:
+    """Parse a Trias document in a single pass with namespace prefixes removed."""
+    return (backend or _DEFAULT_BACKEND).parse(body)
+
+
+def get_delivery_payload(document: dict) -> dict:
+    """Return the DeliveryPayload of a parsed document, raising on API errors."""
+    try:
+        trias_payload = document["Trias"]["ServiceDelivery"]["DeliveryPayload"]
+    except (KeyError, TypeError):
+        raise exceptions.ApiError("Invalid response structure")
+
+    if not isinstance(trias_payload, dict):
+        raise exceptions.ApiError("Invalid response structure")
+
+    for key in RESPONSE_KEYS:
+        trias_data = trias_payload.get(key) or {}
+        error_text = (trias_data.get("ErrorMessage") or {}).get("Text") or {}
+        error_message = error_text.get("Text")
+        if error_message:
+            raise exceptions.ApiError(error_message)
+
+    return trias_payload
+
+
+def parse_response(body: bytes | str, backend: ParserBackend | None = None):
+    """Parse a Trias response and return its DeliveryPayload."""
+    return get_delivery_payload(parse_xml(body, backend))
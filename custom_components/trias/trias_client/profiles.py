@@ -0,0 +1,86 @@
+"""Request profiles controlling how much a Trias response contains."""
+
+from typing import NamedTuple
+
+from .parser import SKIPPED_ELEMENTS
+
+PROFILE_MINIMAL = "minimal"
+PROFILE_STANDARD = "standard"
+PROFILE_FULL = "full"
+
+
+class RequestProfile(NamedTuple):
+    """Content flags sent in the Params of stop event and trip requests."""
+
+    realtime: bool
+    previous_calls: bool
+    onward_calls: bool
+    intermediate_stops: bool
+    track_sections: bool
+    leg_projection: bool
+
+    def skipped_elements(self) -> frozenset[str]:
+        """Return the response elements the parser drops for this profile.
+
+        Subtrees the profile asks for are kept, the others are skipped.
+        """
+        kept = {
+            element
+            for flag, elements in PROFILE_ELEMENTS.items()
+            if getattr(self, flag)
+            for element in elements
+        }
+        return SKIPPED_ELEMENTS - kept
+
+
+# Response elements brought in by each content flag
+PROFILE_ELEMENTS: dict[str, tuple[str, ...]] = {
+    "previous_calls": ("PreviousCall",),
+    "onward_calls": ("OnwardCall",),
+    "intermediate_stops": ("LegIntermediates",),
+    "track_sections": ("LegTrack", "TrackSection"),
+    "leg_projection": ("LegProjection",),
+}
+
+
+# Leg projections are full coordinate polylines and by far the largest part
+# of a TripResponse, they are only requested by the full profile. Realtime
+# data is always requested, delays drive the sensors and the refresh rate.
+PROFILES: dict[str, RequestProfile] = {
+    PROFILE_MINIMAL: RequestProfile(
+        realtime=True,
+        previous_calls=False,
+        onward_calls=False,
+        intermediate_stops=False,
+        track_sections=False,
+        leg_projection=False,
+    ),
+    PROFILE_STANDARD: RequestProfile(
+        realtime=True,
+        previous_calls=False,
+        onward_calls=True,
+        intermediate_stops=True,
+        track_sections=False,
+        leg_projection=False,
+    ),
+    PROFILE_FULL: RequestProfile(
+        realtime=True,
+        previous_calls=True,
+        onward_calls=True,
+        intermediate_stops=True,
+        track_sections=True,
+        leg_projection=True,
+    ),
+}
+
+DEFAULT_PROFILE = PROFILE_MINIMAL
+
+
+def get_profile(name: str | None = DEFAULT_PROFILE) -> RequestProfile:
+    """Return a profile by name, falling back to the default one."""
+    return PROFILES.get(name or DEFAULT_PROFILE, PROFILES[DEFAULT_PROFILE])
+
+
+def xml_bool(value: bool) -> str:
+    """Return a flag as an xs:boolean."""
+    return "true" if value else "false"
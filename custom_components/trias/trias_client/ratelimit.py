@@ -0,0 +1,181 @@
+"""Rate limiting of requests to Trias endpoints."""
+
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+from itertools import count
+import logging
+
+from yarl import URL
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RATE_LIMIT = 2.0  # Requests per second
+DEFAULT_RATE_BURST = 10
+DEFAULT_MAX_CONCURRENT = 4
+
+# Lower values are served first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class RateLimiter:
+    """Token bucket with a concurrency cap and a priority queue.
+
+    A request may start when a token is available and fewer than
+    `max_concurrent` requests are running. Tokens refill at `rate` per second
+    up to `burst`. Waiting requests are started in priority order, and in
+    arrival order within the same priority.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: int = DEFAULT_RATE_BURST,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ) -> None:
+        self.configure(rate, burst, max_concurrent)
+        self._tokens = float(self.burst)
+        self._updated: float | None = None
+        self._active = 0
+        self._queue: list[tuple[int, int, asyncio.Future]] = []
+        self._counter = count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+        self.granted = 0
+        self.wait_time = 0.0
+        self.wait_max = 0.0
+        self.last_wait = 0.0
+
+    def configure(self, rate: float, burst: int, max_concurrent: int) -> None:
+        """Change the limits, applied from the next request on."""
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1, int(burst))
+        self.max_concurrent = max(1, int(max_concurrent))
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of waiting requests."""
+        return sum(not future.done() for _, _, future in self._queue)
+
+    @asynccontextmanager
+    async def limit(self, priority: int = PRIORITY_NORMAL):
+        """Wait for a slot and hold it while the block runs."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        enqueued = loop.time()
+        heapq.heappush(self._queue, (priority, next(self._counter), future))
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted right before the cancellation
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+            raise
+
+        wait = loop.time() - enqueued
+        self.granted += 1
+        self.wait_time += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.last_wait = wait
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            elapsed = now - self._updated
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._refill(loop.time())
+
+        while self._queue:
+            future = self._queue[0][2]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            if self._active >= self.max_concurrent:
+                return
+            if self._tokens < 1:
+                self._schedule_wakeup((1 - self._tokens) / self.rate)
+                return
+
+            heapq.heappop(self._queue)
+            self._tokens -= 1
+            self._active += 1
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            return
+
+        def _wakeup() -> None:
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = asyncio.get_running_loop().call_later(delay, _wakeup)
+
+    def diagnostics(self) -> dict:
+        """Return the limits, queue depth and wait times."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "tokens": round(self._tokens, 2),
+            "active": self._active,
+            "queue_depth": self.queue_depth,
+            "granted": self.granted,
+            "wait_avg": self.wait_time / self.granted if self.granted else 0.0,
+            "wait_max": self.wait_max,
+            "wait_last": self.last_wait,
+        }
+
+
+class RateLimiterRegistry:
+    """Hand out one rate limiter per endpoint and api key.
+
+    Providers count requests per key, so all clients using the same key on
+    the same endpoint share one budget. Endpoints are told apart by their
+    full URL, a mirror on the same host under another path has its own.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: dict[tuple[str, str], RateLimiter] = {}
+
+    def get(
+        self,
+        url: str,
+        api_key: str,
+        rate: float = DEFAULT_RATE_LIMIT,
+        burst: int = DEFAULT_RATE_BURST,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ) -> RateLimiter:
+        """Return the shared limiter, configured with the given limits."""
+        key = (str(URL(url)), api_key)
+        limiter = self._limiters.get(key)
+
+        if limiter is None:
+            _LOGGER.debug("Creating rate limiter for %s", key[0])
+            limiter = RateLimiter(rate, burst, max_concurrent)
+            self._limiters[key] = limiter
+        else:
+            limiter.configure(rate, burst, max_concurrent)
+
+        return limiter
+
+
+LIMITERS = RateLimiterRegistry()
@@ -0,0 +1,178 @@
+"""Retry backoff and circuit breaking for Trias endpoints."""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import random
+import time
+
+from yarl import URL
+
+from . import exceptions
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_BASE = 1.0  # Seconds
+DEFAULT_BACKOFF_MAX = 30.0  # Seconds
+# A request with all its retries ends before the 30s callers wait for it
+DEFAULT_REQUEST_DEADLINE = 25.0  # Seconds
+DEFAULT_ATTEMPT_TIMEOUT = 10.0  # Seconds
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 60  # Seconds
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = DEFAULT_BACKOFF_BASE,
+    maximum: float = DEFAULT_BACKOFF_MAX,
+) -> float:
+    """Return a jittered exponential delay before retry number attempt."""
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds to wait from a Retry-After header, if any."""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """Stop sending requests to an endpoint that keeps failing.
+
+    After `failure_threshold` consecutive retryable failures the circuit
+    opens and requests fail right away. Once `recovery_timeout` has passed,
+    or the delay the endpoint asked for with Retry-After, a single probe
+    request is let through. Its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+    ) -> None:
+        self.configure(failure_threshold, recovery_timeout)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._open_until = 0.0
+        self._probe_started: float | None = None
+
+        self.opened = 0
+        self.rejected = 0
+
+    def configure(self, failure_threshold: int, recovery_timeout: float) -> None:
+        """Change the thresholds."""
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = max(0.0, float(recovery_timeout))
+
+    def before_request(self) -> None:
+        """Raise CircuitOpen unless a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return
+
+        now = time.monotonic()
+        if self.state == STATE_OPEN and now >= self._open_until:
+            _LOGGER.debug("Circuit half open, sending a probe request")
+            self.state = STATE_HALF_OPEN
+            self._probe_started = None
+
+        # Only one probe at a time, a probe that never reported back is
+        # replaced after the recovery timeout
+        if self.state == STATE_HALF_OPEN and (
+            self._probe_started is None
+            or now - self._probe_started > self.recovery_timeout
+        ):
+            self._probe_started = now
+            return
+
+        self.rejected += 1
+        raise exceptions.CircuitOpen("Endpoint unavailable, request not sent")
+
+    def record_success(self) -> None:
+        """Close the circuit after the endpoint answered."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Endpoint recovered, circuit closed")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Count a retryable failure and open the circuit if needed."""
+        self.failures += 1
+        if self.state != STATE_HALF_OPEN and self.failures < self.failure_threshold:
+            return
+
+        if self.state != STATE_OPEN:
+            _LOGGER.warning(
+                "Endpoint failed %s times in a row, pausing requests", self.failures
+            )
+            self.opened += 1
+        self.state = STATE_OPEN
+        self._probe_started = None
+        self._open_until = time.monotonic() + max(
+            self.recovery_timeout, retry_after or 0.0
+        )
+
+    def diagnostics(self) -> dict:
+        """Return the circuit state and counters."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "retry_in": max(0.0, self._open_until - time.monotonic()),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Hand out one circuit breaker per endpoint and api key.
+
+    Rate limit responses (429) apply to a single key, so a key that ran out
+    of its budget does not pause requests made with other keys. Endpoints
+    are told apart by their full URL, like for rate limiting.
+    """
+
+    def __init__(self) -> None:
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def get(
+        self,
+        url: str,
+        api_key: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+    ) -> CircuitBreaker:
+        """Return the shared breaker, configured with the given thresholds."""
+        key = (str(URL(url)), api_key)
+        breaker = self._breakers.get(key)
+
+        if breaker is None:
+            breaker = CircuitBreaker(failure_threshold, recovery_timeout)
+            self._breakers[key] = breaker
+        else:
+            breaker.configure(failure_threshold, recovery_timeout)
+
+        return breaker
+
+
+BREAKERS = CircuitBreakerRegistry()
@@ -0,0 +1,85 @@
+"""Shared aiohttp sessions for Trias endpoints."""
+
+import logging
+
+import aiohttp
+from yarl import URL
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_LIMIT_PER_HOST = 8
+DEFAULT_KEEPALIVE_TIMEOUT = 60  # Seconds
+DEFAULT_DNS_CACHE_TTL = 300  # Seconds
+
+
+class SessionRegistry:
+    """Hand out one reference counted session per endpoint.
+
+    Clients talking to the same scheme, host and port share a connection pool,
+    so keep-alive connections and resolved addresses are reused between
+    config entries. A session is closed once its last client released it.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache: int = DEFAULT_DNS_CACHE_TTL,
+    ) -> None:
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._refs: dict[str, int] = {}
+
+    @staticmethod
+    def endpoint_key(url: str) -> str:
+        """Return the key sessions are shared by."""
+        return str(URL(url).origin())
+
+    def acquire(self, url: str) -> aiohttp.ClientSession:
+        """Return the shared session for url and take a reference on it."""
+        key = self.endpoint_key(url)
+        session = self._sessions.get(key)
+
+        if session is None or session.closed:
+            _LOGGER.debug("Creating aiohttp session for %s", key)
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[key] = session
+            self._refs[key] = 0
+
+        self._refs[key] += 1
+        return session
+
+    async def release(self, url: str) -> None:
+        """Drop a reference and close the session when it is unused."""
+        key = self.endpoint_key(url)
+        if key not in self._refs:
+            return
+
+        self._refs[key] -= 1
+        if self._refs[key] > 0:
+            return
+
+        del self._refs[key]
+        session = self._sessions.pop(key)
+        if not session.closed:
+            _LOGGER.debug("Closing aiohttp session for %s", key)
+            await session.close()
+
+    def diagnostics(self) -> dict:
+        """Return the shared sessions and their reference counts."""
+        return {
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "ttl_dns_cache": self.ttl_dns_cache,
+            "sessions": dict(self._refs),
+        }
+
+
+SESSIONS = SessionRegistry()
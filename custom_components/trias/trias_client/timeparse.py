@@ -0,0 +1,61 @@
+"""Cached parsing of Trias timestamps and ISO 8601 durations."""
+
+import datetime
+from functools import lru_cache
+import re
+
+# Responses repeat the same timestamps many times (the timetabled times of a
+# stop, trip and leg boundaries), and consecutive refreshes return mostly the
+# same ones. Datetimes are immutable, so parsed values can be shared.
+TIMESTAMP_CACHE_SIZE = 4096
+DURATION_CACHE_SIZE = 512
+
+_NUMBER = r"(\d+(?:[.,]\d+)?)"
+_DURATION = re.compile(
+    rf"(?P<sign>[-+])?P(?!$)"
+    rf"(?:{_NUMBER}Y)?(?:{_NUMBER}M)?(?:{_NUMBER}W)?(?:{_NUMBER}D)?"
+    rf"(?:T(?=\d)(?:{_NUMBER}H)?(?:{_NUMBER}M)?(?:{_NUMBER}S)?)?"
+)
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_timestamp(value: str) -> datetime.datetime:
+    """Return the datetime of an xs:dateTime string."""
+    return datetime.datetime.fromisoformat(value)
+
+
+def _number(value: str | None) -> float:
+    return float(value.replace(",", ".")) if value else 0.0
+
+
+@lru_cache(maxsize=DURATION_CACHE_SIZE)
+def parse_iso_duration(value: str) -> datetime.timedelta:
+    """Return the timedelta of an ISO 8601 (xs:duration) string.
+
+    Weeks, days, hours, minutes and (fractional) seconds are supported.
+    Years and months have no fixed length and raise ValueError unless zero.
+    """
+    match = _DURATION.fullmatch(value)
+    if match is None:
+        raise ValueError(f"Invalid ISO 8601 duration: {value!r}")
+
+    sign, years, months, weeks, days, hours, minutes, seconds = match.groups()
+    if _number(years) or _number(months):
+        raise ValueError(f"Duration with years or months: {value!r}")
+
+    duration = datetime.timedelta(
+        weeks=_number(weeks),
+        days=_number(days),
+        hours=_number(hours),
+        minutes=_number(minutes),
+        seconds=_number(seconds),
+    )
+    return -duration if sign == "-" else duration
+
+
+def cache_info() -> dict:
+    """Return the hit rates of the caches."""
+    return {
+        "timestamps": parse_timestamp.cache_info()._asdict(),
+        "durations": parse_iso_duration.cache_info()._asdict(),
+    }
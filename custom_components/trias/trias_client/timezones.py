@@ -0,0 +1,60 @@
+"""Time zone resolution and request time formatting."""
+
+import datetime
+from functools import lru_cache
+import logging
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Used when no time zone is configured, most TRIAS endpoints are German
+DEFAULT_TIME_ZONE = "Europe/Berlin"
+
+UTC = datetime.timezone.utc
+
+
+def get_time_zone(time_zone: str | datetime.tzinfo | None = None) -> datetime.tzinfo:
+    """Return the time zone by IANA name, resolved once.
+
+    Time zones resolved by the caller are returned as they are. Unknown names
+    fall back to the default time zone.
+    """
+    if isinstance(time_zone, datetime.tzinfo):
+        return time_zone
+    return _zone_by_name(time_zone or DEFAULT_TIME_ZONE)
+
+
+@lru_cache(maxsize=16)
+def _zone_by_name(name: str) -> datetime.tzinfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        _LOGGER.warning(
+            "Unknown time zone %s, using %s instead", name, DEFAULT_TIME_ZONE
+        )
+        return ZoneInfo(DEFAULT_TIME_ZONE)
+
+
+def format_zulu(dt: datetime.datetime | None = None) -> str:
+    """Return a timezone aware datetime as UTC with milliseconds, e.g.
+    '2023-12-01T06:00:00.000Z'. Defaults to now.
+    """
+    if dt is None:
+        dt = datetime.datetime.now(UTC)
+    elif dt.tzinfo is None:
+        raise ValueError("Datetime object must have a timezone")
+    else:
+        dt = dt.astimezone(UTC)
+
+    return dt.replace(tzinfo=None).isoformat(timespec="milliseconds") + "Z"
+
+
+def format_local(dt: datetime.datetime, time_zone: datetime.tzinfo) -> str:
+    """Return a datetime as local time of the endpoint, e.g. '2023-12-01T07:00:00'.
+
+    Naive datetimes are taken to be local already.
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(time_zone).replace(tzinfo=None)
+
+    return dt.isoformat(timespec="seconds")
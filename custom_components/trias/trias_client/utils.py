@@ -1,42 +1,23 @@
 import datetime
 
-import pytz
+from .timeparse import parse_iso_duration, parse_timestamp
+from .timezones import format_local, format_zulu, get_time_zone
 
 
 def convert_to_zulu_format(dt=None):
     """
     Convert a datetime object to a Zulu-formatted string (UTC).
     """
-    if dt is None:
-        dt = datetime.datetime.now(pytz.utc)
+    return format_zulu(dt)
 
-    # Ensure the datetime object has a timezone
-    if dt.tzinfo is None:
-        raise ValueError("Datetime object must have a timezone")
 
-    # Convert to UTC
-    dt_utc = dt.astimezone(pytz.utc).replace(tzinfo=None)
-
-    # Format as a string
-    formatted_string = dt_utc.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
-
-    return formatted_string
-
-
-def convert_to_local_format(dt):
+def convert_to_local_format(dt, time_zone=None):
     """
     Convert a datetime object to a string in local time format '2023-12-01T07:00:00'.
-    """
-    # Ensure the datetime object has a timezone
-    if dt.tzinfo is not None:
-        dt = dt.astimezone(
-            pytz.timezone("Europe/Berlin")
-        )  # Replace 'Europe/Berlin' with your desired timezone
 
-    # Format as a string
-    formatted_string = dt.strftime("%Y-%m-%dT%H:%M:%S")
-
-    return formatted_string
+    The time zone of the endpoint defaults to Europe/Berlin.
+    """
+    return format_local(dt, get_time_zone(time_zone))
 
 
 def to_datetime(zulu_time):
@@ -44,33 +25,20 @@ def to_datetime(zulu_time):
     if not zulu_time:
         return None
 
-    return datetime.datetime.fromisoformat(zulu_time)
+    return parse_timestamp(zulu_time)
 
 
 def parse_duration(duration):
     """
-    Parse a duration string in the format "PT[hours]H[minutes]M" into a timedelta object.
+    Parse an ISO 8601 duration string like "PT1H5M" for display.
 
-    :param duration: a string in the format "PT[hours]H[minutes]M"
-    :return: the timedelta as a string
+    :param duration: an ISO 8601 duration string
+    :return: the timedelta as a string, "0:00:00" if it cannot be parsed
     """
-    minutes = 0
-    hours = 0
-
-    try:
-        hours = int(duration[2 : duration.index("H")])
-    except ValueError:
-        pass
-
     try:
-        if "H" in duration:
-            minutes = int(duration[duration.index("H") + 1 : duration.index("M")])
-        else:
-            minutes = int(duration[2 : duration.index("M")])
-    except ValueError:
-        pass
-
-    parsed_duration = datetime.timedelta(hours=hours, minutes=minutes)
+        parsed_duration = parse_iso_duration(duration)
+    except (TypeError, ValueError):
+        parsed_duration = datetime.timedelta()
     return str(parsed_duration)
 
 